@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from .models import Vendor
+import uuid
+
+VENDOR_TIMEOUT = 60 * 60
+
+
+def version_key(user_id):
+    return f"vendor-version:{user_id}"
+
+
+def get_vendor(user):
+    """
+    Vendor profile of a vendor user, read from the cache when possible.
+    Entries are keyed by a per user version that invalidate_vendor()
+    replaces, so a stale copy written back by a slow reader is never read.
+    """
+    if not user.is_authenticated or user.role != "vendor":
+        return None
+
+    version = cache.get(version_key(user.id))
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(version_key(user.id), version, None):
+            version = cache.get(version_key(user.id), version)
+
+    key = f"vendor:{user.id}:{version}"
+    vendor = cache.get(key)
+    if vendor is None:
+        vendor = Vendor.objects.filter(user_id=user.id).first()
+        if vendor is not None:
+            cache.set(key, vendor, VENDOR_TIMEOUT)
+    return vendor
+
+
+def invalidate_vendor(user_id):
+    cache.set(version_key(user_id), uuid.uuid4().hex, None)
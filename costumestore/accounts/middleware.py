@@ -0,0 +1,23 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+from .cache import get_vendor
+
+
+class VendorMiddleware:
+    """
+    Adds req.vendor, the Vendor of the logged in user (None for everyone
+    else). Like req.user it is only loaded when a view touches it.
+    Async views load it with vendor.views.vendor_required.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, req):
+        req.vendor = SimpleLazyObject(lambda: get_vendor(req.user))
+        return self.get_response(req)
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:08
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Vendor',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('shop_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('aadhar_number', models.CharField(blank=True, max_length=12, null=True)),
+                ('aadhar_image', models.ImageField(blank=True, null=True, upload_to='')),
+                ('pancard_number', models.CharField(blank=True, max_length=10, null=True)),
+                ('pancard_image', models.ImageField(blank=True, null=True, upload_to='')),
+                ('gst_number', models.CharField(blank=True, max_length=15, null=True)),
+                ('business_license', models.ImageField(blank=True, null=True, upload_to='')),
+                ('is_verified', models.BooleanField(default=False)),
+                ('is_document_added', models.BooleanField(default=False)),
+                ('bio', models.TextField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Vendor',
+                'verbose_name_plural': 'Vendors',
+                'db_table': 'vendors',
+            },
+        ),
+    ]
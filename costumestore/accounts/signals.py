@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .cache import invalidate_vendor
+from .models import Vendor
+
+
+@receiver(post_save, sender=Vendor)
+@receiver(post_delete, sender=Vendor)
+def vendor_changed(sender, instance, **kwargs):
+    invalidate_vendor(instance.user_id)
@@ -1,3 +1,54 @@
 from django.test import TestCase
+from django.urls import reverse
+from vendor.tests import create_vendor, PRODUCT_DATA
+from vendor.models import Product
+from .cache import get_vendor
 
-# Create your tests here.
+
+class VendorCacheTest(TestCase):
+    def setUp(self):
+        self.user, self.vendor = create_vendor()
+        self.client.force_login(self.user)
+
+    def test_vendor_is_read_once(self):
+        get_vendor(self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_vendor(self.user), self.vendor)
+
+    def test_save_invalidates(self):
+        get_vendor(self.user)
+
+        self.vendor.shop_name = "renamed"
+        self.vendor.save()
+
+        self.assertEqual(get_vendor(self.user).shop_name, "renamed")
+
+    def test_profile_update_invalidates(self):
+        self.vendor.is_document_added = True
+        self.vendor.save()
+        get_vendor(self.user)
+
+        self.client.post(reverse("vendor_profile"), {"name": "vendor", "shop_name": "new shop"})
+
+        self.assertEqual(get_vendor(self.user).shop_name, "new shop")
+
+    def test_shop_rename_changes_product_page_etag(self):
+        self.vendor.is_document_added = True
+        self.vendor.save()
+        product = Product.objects.create(vendor=self.vendor, images=[], **PRODUCT_DATA)
+        url = reverse("product_page", args=[product.id])
+        etag = self.client.get(url)["ETag"]
+
+        self.client.post(reverse("vendor_profile"), {"name": "vendor", "shop_name": "new shop"})
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "new shop")
+
+    def test_dashboard_uses_cached_vendor(self):
+        self.client.get(reverse("dashboard"))
+
+        # session, user, the rollups and the product list
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("dashboard"))
+        self.assertEqual(response.status_code, 200)
@@ -5,6 +5,8 @@ from django.shortcuts import render, redirect
 from authentication.models import User
 from django.contrib import messages
 from django.views import View
+from django.utils import timezone
+from .cache import invalidate_vendor
 from .models import Vendor
 
 
@@ -15,8 +17,7 @@ def is_vendor(user):
 @method_decorator(user_passes_test(is_vendor, login_url="home_page"), name="dispatch")
 class VendorProfile(View):
     def get(self, req):
-        vendor = Vendor.objects.get(user_id=req.user.id)
-        return render(req, "accounts/vendor.html", context={"vendor": vendor})
+        return render(req, "accounts/vendor.html", context={"vendor": req.vendor})
 
     def post(self, req):
         name: str = req.POST.get("name")
@@ -28,8 +29,7 @@ class VendorProfile(View):
         pancard_image: list = req.FILES.getlist("pancard_image")
         business_license: list = req.FILES.getlist("business_license")
 
-        vendor = Vendor.objects.get(user_id=req.user.id)
-        if vendor.is_document_added:
+        if req.vendor.is_document_added:
             # validate input data
             errors = validate_data(
                 VendorDetailsSchema,
@@ -43,10 +43,14 @@ class VendorProfile(View):
                 return redirect("vendor_profile")
 
             # update data in database
+            # update() skips auto_now, the product pages' ETag reads updated_at
             Vendor.objects.filter(user_id=req.user.id).update(
                 shop_name=shop_name,
+                updated_at=timezone.now(),
             )
             User.objects.filter(id=req.user.id).update(name=name)
+            # update() sends no post_save, drop the cached profile ourselves
+            invalidate_vendor(req.user.id)
 
             return redirect("vendor_profile")
 
@@ -78,10 +82,12 @@ class VendorProfile(View):
                 aadhar_image=aadhar_image,
                 pancard_image=pancard_image,
                 business_license=business_license,
-                is_document_added = True
+                is_document_added = True,
+                updated_at=timezone.now(),
             )
 
             User.objects.filter(id=req.user.id).update(name=name)
+            invalidate_vendor(req.user.id)
 
         except Exception as e:
             print(e)
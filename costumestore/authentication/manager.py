@@ -1,4 +1,5 @@
 from django.contrib.auth.models import BaseUserManager
+from django.db import transaction
 
 
 class CustomUserManager(BaseUserManager):
@@ -10,7 +11,10 @@ class CustomUserManager(BaseUserManager):
         email = self.normalize_email(email)
         user = self.model(email=email, **extra_fields)
         user.set_password(password)
-        user.save(self._db)
+        # the post_save signal creates the vendor profile and queues the
+        # activation email, both commit or roll back with the user row
+        with transaction.atomic(using=self._db):
+            user.save(using=self._db)
         return user
 
     def create_superuser(self, email, password=None, **extra_fields):
@@ -1,4 +1,4 @@
-from .services import send_account_activation_email
+from taskqueue.queue import enqueue
 from django.contrib.auth.models import AbstractUser
 from django.db.models.signals import post_save
 from .manager import CustomUserManager
@@ -8,6 +8,10 @@ from accounts.models import Vendor
 import uuid
 
 
+def generate_email_token():
+    return str(uuid.uuid4())
+
+
 class User(AbstractUser):
     id = models.UUIDField(
         primary_key=True, unique=True, default=uuid.uuid4, editable=False
@@ -17,7 +21,7 @@ class User(AbstractUser):
     phone = models.CharField(max_length=10)
     role = models.CharField(max_length=9, default="customer")
     profile_image = models.URLField(blank=True, null=True)
-    email_token = models.TextField(blank=True)
+    email_token = models.TextField(blank=True, default=generate_email_token)
     is_active = models.BooleanField(default=False)
 
     username = None
@@ -33,22 +37,23 @@ class User(AbstractUser):
         db_table = "users"
         verbose_name = "User"
         verbose_name_plural = "Users"
+        indexes = [
+            # activate_user looks the user up by the token from the email link
+            models.Index(fields=["email_token"], name="users_email_token_idx"),
+        ]
 
 
-# signal to create vendor profile and to send account activation email
+# signal to create vendor profile and to send account activation email,
+# the token is set before the insert so the new row is never written twice
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
-    try:
-        if created:
-            email_token = str(uuid.uuid4())
-            user = User.objects.get(email=instance.email)
-            user.email_token = email_token
-            user.save()
-            
-            # send_account_activation_email(instance.name,instance.email,email_token)
-            if created and instance.role == 'vendor':
-                Vendor.objects.create(user=instance)
-
-            
-    except Exception as e:
-        print(e)
+    if created:
+        # users created active (seeded vendors, superusers) have nothing to
+        # activate. a fresh token, no idempotency key (and its savepoint) needed
+        if not instance.is_active:
+            enqueue(
+                "authentication.send_activation_email",
+                {"name": instance.name, "email": instance.email, "email_token": instance.email_token},
+            )
+        if instance.role == 'vendor':
+            Vendor.objects.create(user=instance)
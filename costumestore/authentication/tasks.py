@@ -0,0 +1,7 @@
+from taskqueue.queue import task
+from .services import send_account_activation_email
+
+
+@task("authentication.send_activation_email")
+def send_activation_email(name, email, email_token):
+    send_account_activation_email(name, email, email_token)
@@ -0,0 +1,60 @@
+from django.test import TestCase
+from django.urls import reverse
+from accounts.models import Vendor
+from taskqueue.models import Task
+from .models import User
+
+
+class CreateUserTest(TestCase):
+    # TestCase wraps create_user's atomic block in a SAVEPOINT/RELEASE pair,
+    # the rest is one INSERT per row: user, activation email task, vendor
+
+    def test_customer_signup_queries(self):
+        with self.assertNumQueries(4):
+            user = User.objects.create_user(
+                email="customer@example.com", password="Signup@123", name="customer", role="customer"
+            )
+
+        self.assertTrue(user.email_token)
+        self.assertFalse(Vendor.objects.filter(user=user).exists())
+
+    def test_vendor_signup_queries(self):
+        with self.assertNumQueries(5):
+            user = User.objects.create_user(
+                email="vendor@example.com", password="Signup@123", name="vendor", role="vendor"
+            )
+
+        self.assertTrue(Vendor.objects.filter(user=user).exists())
+        task = Task.objects.get(name="authentication.send_activation_email")
+        self.assertEqual(task.payload["email_token"], user.email_token)
+        self.assertEqual(User.objects.get(pk=user.pk).email_token, user.email_token)
+
+
+    def test_active_users_get_no_activation_email(self):
+        # e.g. scripts/load_vendors.py legacy mode
+        with self.assertNumQueries(4):
+            user = User.objects.create_user(
+                email="seeded@example.com", password="Vendor@123", name="seeded", role="vendor", is_active=True
+            )
+
+        self.assertTrue(Vendor.objects.filter(user=user).exists())
+        self.assertFalse(Task.objects.exists())
+
+
+class ActivateUserTest(TestCase):
+    def test_activation_link_logs_in(self):
+        user = User.objects.create_user(
+            email="customer@example.com", password="Signup@123", name="customer", role="customer"
+        )
+
+        response = self.client.get(reverse("activate", args=[user.email_token]))
+
+        self.assertRedirects(response, "/", fetch_redirect_response=False)
+        user.refresh_from_db()
+        self.assertTrue(user.is_active)
+        self.assertEqual(self.client.session["_auth_user_id"], str(user.pk))
+
+    def test_unknown_token(self):
+        response = self.client.get(reverse("activate", args=["not-a-token"]))
+
+        self.assertRedirects(response, reverse("auth"), fetch_redirect_response=False)
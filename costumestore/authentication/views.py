@@ -1,4 +1,5 @@
 from .validator import is_valid_email, CustomerSignupValidator
+from asgiref.sync import sync_to_async
 from django.contrib.auth import authenticate, login, logout
 from django.shortcuts import render, redirect
 from django.contrib import messages
@@ -55,7 +56,9 @@ def login_user(req):
 
     return redirect("home_page")
 
-def register_user(req):
+# signup and activation are async, the activation email itself is sent by
+# the task worker (authentication.send_activation_email)
+async def register_user(req):
     email = req.POST.get("email")
     name = req.POST.get("name")
     password = req.POST.get("password")
@@ -82,31 +85,30 @@ def register_user(req):
             return redirect(url + "?email=" + email)
 
     try:
-        User.objects.create_user(
+        # hashing the password and the transaction of create_user run in a thread
+        await sync_to_async(User.objects.create_user)(
             email=email, password=password, name=name, role=role
         )
-        
 
-        response = render(req, "authentication/success.html")
+        response = await sync_to_async(render)(req, "authentication/success.html")
         response['cache-control'] = 'no-cache, no-store, must-revalidate'
         return response
     except Exception as e:
         print(e)
 
 
-def activate_user(req, email_token):
+async def activate_user(req, email_token):
     try:
-        user = User.objects.get(email_token=email_token)
-        if not user:
-            messages.error(req, "Invalid Token")
-            return redirect("auth")
-        
+        user = await User.objects.aget(email_token=email_token)
         user.is_active = True
-        user.save()
-        login(req, user)
+        await user.asave()
+        await sync_to_async(login)(req, user)
         messages.success(req, "Login successful")
         return redirect("/")
 
+    except User.DoesNotExist:
+        messages.error(req, "Invalid Token")
+        return redirect("auth")
     except Exception as e:
         return print(e)
 
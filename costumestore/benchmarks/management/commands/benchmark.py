@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+from benchmarks.runner import SCENARIOS, get_context, run_client, run_http
+from benchmarks.seed import seed, clear
+import subprocess
+import platform
+import django
+import json
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset and measure the latency and throughput of the vendor "
+        "and auth pages, in-process with the test client and/or over HTTP against a "
+        "running server (start it with IMAGE_UPLOADER=vendor.uploads.FakeUploader)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vendors", type=int, default=10)
+        parser.add_argument("--products", type=int, default=100, help="Products per vendor")
+        parser.add_argument("--no-seed", action="store_true", help="Reuse the dataset of the last run")
+        parser.add_argument("--clear", action="store_true", help="Only remove the benchmark dataset")
+        parser.add_argument("--mode", choices=("client", "http", "both"), default="client")
+        parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+        parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server for --mode http")
+        parser.add_argument("--processes", type=int, default=4, help="Load processes for --mode http")
+        parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            clear()
+            self.stdout.write("Benchmark data removed")
+            return
+
+        names = [name.strip() for name in options["scenarios"].split(",") if name.strip()]
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        dataset = None
+        if not options["no_seed"]:
+            dataset = seed(options["vendors"], options["products"])
+            self.stdout.write(f"Seeded {dataset['vendors']} vendors, {dataset['products']} products")
+
+        ctx = get_context()
+        results = []
+
+        if options["mode"] in ("client", "both"):
+            # measure what production runs: no debug query log, no real uploads
+            with override_settings(
+                DEBUG=False,
+                ALLOWED_HOSTS=["testserver"],
+                IMAGE_UPLOADER="vendor.uploads.FakeUploader",
+            ):
+                results += run_client(names, ctx, options["requests"], options["warmup"])
+
+        if options["mode"] in ("http", "both"):
+            results += run_http(
+                names, ctx, options["requests"], options["warmup"], options["url"], options["processes"]
+            )
+
+        self.stdout.write(
+            f"{'scenario':14} {'mode':6} {'requests':>8} {'errors':>6} {'mean':>8} "
+            f"{'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8}"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['scenario']:14} {row['mode']:6} {row['requests']:>8} {row['errors']:>6} "
+                f"{row['mean_ms']:>8.2f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+                f"{row['p99_ms']:>8.2f} {row['rps']:>8.1f}"
+            )
+
+        if options["output"]:
+            report = {
+                "created_at": timezone.now().isoformat(),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "options": {
+                    key: options[key]
+                    for key in ("mode", "requests", "warmup", "url", "processes", "vendors", "products")
+                },
+                "dataset": dataset,
+                "results": results,
+            }
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
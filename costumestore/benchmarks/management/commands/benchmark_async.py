@@ -0,0 +1,213 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+from benchmarks.runner import get_context, summarize
+from benchmarks.seed import delete_products, seed
+from accounts.models import Vendor
+from vendor.models import Product
+from vendor.rollups import rebuild_rollups
+from website.facets import rebuild_facets
+from PIL import Image
+import asyncio
+import time
+import json
+import io
+
+PRODUCT_NAME = "Async Benchmark Saree"
+
+PRODUCT_DATA = {
+    "name": PRODUCT_NAME,
+    "colors": "red",
+    "dimension": "",
+    "category": "women",
+    "subcategory": "Clothing",
+    "rating": 4,
+    "price": 1200,
+    "discount": 10,
+    "stock": 5,
+    "description": "Uploaded by benchmark_async",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Send a burst of Add Product requests with images to one process, served by the "
+        "WSGI handler on a pool of threads (like gunicorn --threads) and by the ASGI handler "
+        "on one event loop, with a fake uploader that takes --delay seconds per image"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=64, help="Requests sent at once")
+        parser.add_argument("--threads", type=int, default=8, help="Request threads of the WSGI run")
+        parser.add_argument("--images", type=int, default=2, help="Images per request")
+        parser.add_argument("--delay", type=float, default=0.5, help="Seconds the fake uploader takes")
+        parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    def build_request(self, ctx, images):
+        """Body, content type and cookies of a logged in Add Product post."""
+        client = Client()
+        client.force_login(ctx["user"])
+        csrf = get_random_string(32)
+        cookies = "; ".join([f"csrftoken={csrf}"] + [f"{name}={c.value}" for name, c in client.cookies.items()])
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (800, 600), "red").save(buffer, "JPEG")
+        files = [
+            SimpleUploadedFile(f"image-{i}.jpg", buffer.getvalue(), content_type="image/jpeg")
+            for i in range(images)
+        ]
+
+        body = encode_multipart(BOUNDARY, {**PRODUCT_DATA, "csrfmiddlewaretoken": csrf, "images": files})
+        return {"path": reverse("add_product"), "body": body, "cookies": cookies}
+
+    def run_wsgi(self, request, count, threads):
+        """Every request is queued at once, a thread serves one request at a time."""
+        handler = WSGIHandler()
+
+        def call(start):
+            environ = {
+                "REQUEST_METHOD": "POST",
+                "PATH_INFO": request["path"],
+                "QUERY_STRING": "",
+                "SERVER_NAME": "testserver",
+                "SERVER_PORT": "80",
+                "SERVER_PROTOCOL": "HTTP/1.1",
+                "CONTENT_TYPE": MULTIPART_CONTENT,
+                "CONTENT_LENGTH": str(len(request["body"])),
+                "HTTP_COOKIE": request["cookies"],
+                "wsgi.input": io.BytesIO(request["body"]),
+                "wsgi.url_scheme": "http",
+            }
+            status = []
+            response = handler(environ, lambda line, headers: status.append(line))
+            # closing the response ends the request and its database connection
+            response.close()
+            return time.perf_counter() - start, not status[0].startswith("302")
+
+        with ThreadPoolExecutor(threads) as pool:
+            start = time.perf_counter()
+            outcomes = list(pool.map(call, [start] * count))
+            elapsed = time.perf_counter() - start
+
+        return outcomes, elapsed
+
+    def run_asgi(self, request, count):
+        """Every request is started at once on one event loop."""
+        handler = ASGIHandler()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": request["path"],
+            "raw_path": request["path"].encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"content-type", MULTIPART_CONTENT.encode()),
+                (b"content-length", str(len(request["body"])).encode()),
+                (b"cookie", request["cookies"].encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+
+        async def call(start):
+            messages = [{"type": "http.request", "body": request["body"], "more_body": False}]
+            status = []
+
+            async def receive():
+                if messages:
+                    return messages.pop()
+                # the client stays connected
+                await asyncio.Event().wait()
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    status.append(message["status"])
+
+            await handler(dict(scope), receive, send)
+            return time.perf_counter() - start, status[0] != 302
+
+        async def burst():
+            start = time.perf_counter()
+            outcomes = await asyncio.gather(*(call(start) for _ in range(count)))
+            return outcomes, time.perf_counter() - start
+
+        return asyncio.run(burst())
+
+    def measure(self, name, run, vendor):
+        outcomes, elapsed = run()
+        created = Product.objects.filter(vendor=vendor, name=PRODUCT_NAME)
+        saved = created.count()
+        # no signals: the fake images were never uploaded, there is nothing
+        # for the asset sweeper to delete
+        delete_products(created)
+        rebuild_facets()
+        rebuild_rollups(vendor.id)
+
+        latencies = [latency for latency, _ in outcomes]
+        # the view redirects even when saving failed, count what was saved too
+        errors = max(sum(failed for _, failed in outcomes), len(outcomes) - saved)
+        return summarize(name, name, latencies, errors, elapsed)
+
+    def handle(self, *args, **options):
+        try:
+            ctx = get_context()
+        except ValueError:
+            seed(vendors=1, products=10)
+            ctx = get_context()
+        vendor = Vendor.objects.get(user=ctx["user"])
+        request = self.build_request(ctx, options["images"])
+        count = options["requests"]
+
+        # a connection per request in both runs, ASGI serves every request from a new thread
+        max_age = connection.settings_dict.get("CONN_MAX_AGE", 0)
+        connection.close()
+        connection.settings_dict["CONN_MAX_AGE"] = 0
+        try:
+            with override_settings(
+                DEBUG=False,
+                ALLOWED_HOSTS=["testserver"],
+                IMAGE_UPLOADER="vendor.uploads.FakeUploader",
+                IMAGE_UPLOAD_FAKE_DELAY=options["delay"],
+                IMAGE_UPLOAD_MODE="inline",
+            ):
+                results = [
+                    self.measure("wsgi", lambda: self.run_wsgi(request, count, options["threads"]), vendor),
+                    self.measure("asgi", lambda: self.run_asgi(request, count), vendor),
+                ]
+        finally:
+            connection.close()
+            connection.settings_dict["CONN_MAX_AGE"] = max_age
+
+        self.stdout.write(
+            f"{count} requests at once, {options['images']} images each, {options['delay']}s per upload, "
+            f"{options['threads']} WSGI threads"
+        )
+        for row in results:
+            self.stdout.write(
+                f"{row['scenario']:5} {row['errors']:>4} errors  mean {row['mean_ms']:.0f} ms  "
+                f"p95 {row['p95_ms']:.0f} ms  max {row['max_ms']:.0f} ms  {row['rps']:.1f} req/s"
+            )
+        speedup = results[1]["rps"] / results[0]["rps"]
+        self.stdout.write(f"asgi serves {speedup:.1f}x the requests per second of wsgi")
+
+        if options["output"]:
+            report = {
+                "options": {key: options[key] for key in ("requests", "threads", "images", "delay")},
+                "results": results,
+                "speedup": speedup,
+            }
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
@@ -0,0 +1,104 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, close_old_connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from benchmarks.runner import get_context, summarize
+from benchmarks.seed import seed
+from costumestore.routers import primary
+import json
+import time
+
+DUMMY_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what opening a database connection costs per request: the product page "
+        "with a new connection per request (CONN_MAX_AGE=0) against a persistent one"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--max-age", type=int, default=600, help="CONN_MAX_AGE of the persistent run")
+        parser.add_argument("--output", help="Write the results as JSON to this file")
+
+    def connect_times(self, count):
+        times = []
+        for _ in range(count):
+            connection.close()
+            start = time.perf_counter()
+            connection.ensure_connection()
+            times.append(time.perf_counter() - start)
+        return times
+
+    def run_requests(self, url, count, max_age):
+        """
+        Request `url` the way the request handler would: old connections are
+        closed when a request starts and ends, which is when CONN_MAX_AGE
+        applies (the test client itself skips this).
+        """
+        connection.close()
+        connection.settings_dict["CONN_MAX_AGE"] = max_age
+        connection.settings_dict["CONN_HEALTH_CHECKS"] = max_age > 0
+
+        connects = []
+        count_connect = lambda **kwargs: connects.append(1)  # noqa: E731
+        connection_created.connect(count_connect)
+
+        client = Client()
+        latencies = []
+        start = time.perf_counter()
+        try:
+            for _ in range(count):
+                request_start = time.perf_counter()
+                close_old_connections()
+                client.get(url)
+                close_old_connections()
+                latencies.append(time.perf_counter() - request_start)
+        finally:
+            connection_created.disconnect(count_connect)
+
+        name = "new connection" if max_age == 0 else f"persistent ({max_age}s)"
+        result = summarize(name, "client", latencies, 0, time.perf_counter() - start)
+        result["connections"] = len(connects)
+        return result
+
+    def handle(self, *args, **options):
+        # everything runs on the primary connection, the one being measured
+        with primary():
+            self.benchmark(options)
+
+    def benchmark(self, options):
+        try:
+            ctx = get_context()
+        except ValueError:
+            seed(vendors=1, products=10)
+            ctx = get_context()
+        url = reverse("product_page", args=[ctx["product_id"]])
+        saved = dict(connection.settings_dict)
+
+        try:
+            connect = summarize("connect", "raw", self.connect_times(options["requests"]), 0, 0)
+            with override_settings(CACHES=DUMMY_CACHE, DEBUG=False, ALLOWED_HOSTS=["testserver"]):
+                results = [
+                    self.run_requests(url, options["requests"], 0),
+                    self.run_requests(url, options["requests"], options["max_age"]),
+                ]
+        finally:
+            connection.close()
+            connection.settings_dict.update(saved)
+
+        self.stdout.write(f"connect: mean {connect['mean_ms']:.2f} ms, p95 {connect['p95_ms']:.2f} ms")
+        for row in results:
+            self.stdout.write(
+                f"{row['scenario']:18} {row['connections']:>5} connections  mean {row['mean_ms']:.2f} ms  "
+                f"p95 {row['p95_ms']:.2f} ms  {row['rps']:.1f} req/s"
+            )
+        saved_ms = results[0]["mean_ms"] - results[1]["mean_ms"]
+        self.stdout.write(f"persistent connections save {saved_ms:.2f} ms per request")
+
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump({"connect": connect, "results": results, "saved_ms": saved_ms}, file, indent=2)
@@ -0,0 +1,175 @@
+from multiprocessing import Pool
+from urllib.parse import urlencode, urlsplit
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+from accounts.models import Vendor
+from vendor.models import Product
+from .seed import bench_users, PASSWORD
+import http.client
+import statistics
+import time
+
+# what every scenario requests, "login" scenarios run as the seeded vendor
+SCENARIOS = {
+    "dashboard": {"method": "GET", "path": lambda ctx: reverse("dashboard"), "login": True},
+    "store": {"method": "GET", "path": lambda ctx: reverse("store"), "login": True},
+    "edit_product": {
+        "method": "GET",
+        "path": lambda ctx: reverse("edit_product", args=[ctx["product_id"]]),
+        "login": True,
+    },
+    "auth": {
+        "method": "POST",
+        "path": lambda ctx: reverse("auth"),
+        "data": lambda ctx: {"email": ctx["email"]},
+        "login": False,
+    },
+    "login": {
+        "method": "POST",
+        "path": lambda ctx: reverse("login"),
+        "data": lambda ctx: {"email": ctx["email"], "password": PASSWORD},
+        "login": False,
+    },
+}
+
+
+def get_context():
+    """The seeded vendor and product every scenario works on."""
+    user = bench_users().order_by("email").first()
+    if user is None:
+        raise ValueError("No benchmark data, seed it first")
+
+    vendor = Vendor.objects.get(user=user)
+    product = Product.objects.filter(vendor=vendor).first()
+    return {"user": user, "email": user.email, "product_id": str(product.id)}
+
+
+def summarize(name, mode, latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    count = len(latencies)
+
+    def percentile(p):
+        return latencies[min(count - 1, int(count * p))] * 1000 if count else None
+
+    return {
+        "scenario": name,
+        "mode": mode,
+        "requests": count,
+        "errors": errors,
+        "mean_ms": statistics.mean(latencies) * 1000 if count else None,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": latencies[-1] * 1000 if count else None,
+        "rps": count / elapsed if elapsed else None,
+    }
+
+
+def run_client(names, ctx, requests, warmup):
+    """Run each scenario in-process through the Django test client."""
+    logged_in = Client()
+    logged_in.force_login(ctx["user"])
+    anonymous = Client()
+
+    results = []
+    for name in names:
+        scenario = SCENARIOS[name]
+        client = logged_in if scenario["login"] else anonymous
+        path = scenario["path"](ctx)
+        data = scenario["data"](ctx) if "data" in scenario else None
+        send = client.post if scenario["method"] == "POST" else client.get
+
+        latencies, errors = [], 0
+        start = time.perf_counter()
+        for i in range(warmup + requests):
+            request_start = time.perf_counter()
+            try:
+                response = send(path, data)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            if i >= warmup:
+                latencies.append(time.perf_counter() - request_start)
+                errors += failed
+            if i == warmup - 1:
+                start = time.perf_counter()
+
+        # login rotates the session of the anonymous client, start clean
+        anonymous.logout()
+        results.append(summarize(name, "client", latencies, errors, time.perf_counter() - start))
+
+    return results
+
+
+def http_worker(job):
+    """
+    One load process: send `count` requests over plain HTTP and return
+    their latencies. It only talks HTTP, Django is not used here.
+    """
+    url, method, path, data, cookies, count = job
+    parts = urlsplit(url)
+    csrf = get_random_string(32)
+
+    headers = {"Cookie": "; ".join([f"csrftoken={csrf}"] + cookies)}
+    body = None
+    if method == "POST":
+        body = urlencode({**data, "csrfmiddlewaretoken": csrf})
+        headers["Content-Type"] = "application/x-www-form-urlencoded"
+
+    latencies, errors = [], 0
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            errors += response.status >= 400
+            if response.getheader("Connection", "").lower() == "close":
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+    return latencies, errors
+
+
+def run_http(names, ctx, requests, warmup, url, processes):
+    """
+    Drive a running server (runserver, gunicorn, ...) at `url` from
+    `processes` load processes, `requests` per scenario in total.
+    """
+    client = Client()
+    client.force_login(ctx["user"])
+    session = [f"{name}={cookie.value}" for name, cookie in client.cookies.items()]
+
+    # the load processes are forked, they must not share our db connections
+    connections.close_all()
+
+    results = []
+    with Pool(processes) as pool:
+        for name in names:
+            scenario = SCENARIOS[name]
+            cookies = session if scenario["login"] else []
+            data = scenario["data"](ctx) if "data" in scenario else {}
+            job = (url, scenario["method"], scenario["path"](ctx), data, cookies)
+
+            if warmup:
+                pool.map(http_worker, [(*job, max(1, warmup // processes))] * processes)
+
+            share, extra = divmod(requests, processes)
+            jobs = [(*job, share + (i < extra)) for i in range(processes)]
+
+            start = time.perf_counter()
+            outcomes = pool.map(http_worker, jobs)
+            elapsed = time.perf_counter() - start
+
+            latencies = [latency for worker_latencies, _ in outcomes for latency in worker_latencies]
+            errors = sum(worker_errors for _, worker_errors in outcomes)
+            results.append(summarize(name, "http", latencies, errors, elapsed))
+
+    return results
@@ -0,0 +1,92 @@
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from authentication.models import User
+from accounts.models import Vendor
+from vendor.models import Product
+from orders.models import OrderItem
+from website.catalog import CATEGORIES
+from website.facets import rebuild_facets
+from vendor.rollups import rebuild_rollups
+import random
+
+EMAIL_DOMAIN = "bench.local"
+PASSWORD = "Bench@123"
+SUBCATEGORIES = ("Clothing", "Bags", "Shoes")
+
+
+def bench_users():
+    return User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+
+
+def delete_products(products):
+    """
+    Delete the products in one statement, without the per row signals of
+    QuerySet.delete(). Their order items are kept with no product, as
+    on_delete=SET_NULL does. Callers rebuild the facets and rollups.
+    """
+    OrderItem.objects.filter(product__in=products).update(product=None)
+    sql, params = products.values("pk").query.sql_with_params()
+    table, pk = (connection.ops.quote_name(name) for name in (Product._meta.db_table, Product._meta.pk.column))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE {pk} IN ({sql})", params)
+
+
+def clear():
+    with transaction.atomic():
+        # no signals: the seeded images were never uploaded, there is
+        # nothing for the asset sweeper to delete
+        delete_products(Product.objects.filter(vendor__user__in=bench_users()))
+        bench_users().delete()
+    rebuild_facets()
+    rebuild_rollups()
+
+
+def seed(vendors=10, products=100, batch_size=5000):
+    """
+    Replace the benchmark dataset with `vendors` active vendors holding
+    `products` products each. Everything is bulk inserted, the password
+    is hashed once for all of them.
+    """
+    clear()
+    rng = random.Random(42)
+    password = make_password(PASSWORD)
+
+    with transaction.atomic():
+        users = User.objects.bulk_create(
+            [
+                User(
+                    email=f"vendor{i}@{EMAIL_DOMAIN}",
+                    password=password,
+                    name=f"Bench Vendor {i}",
+                    role="vendor",
+                    is_active=True,
+                )
+                for i in range(vendors)
+            ]
+        )
+        shops = Vendor.objects.bulk_create(
+            [Vendor(user=user, shop_name=f"Bench Shop {i}") for i, user in enumerate(users)]
+        )
+
+        rows = []
+        for shop in shops:
+            for i in range(products):
+                subcategory = rng.choice(SUBCATEGORIES)
+                rows.append(
+                    Product(
+                        vendor=shop,
+                        name=f"{subcategory} {rng.randint(1, 100000)}",
+                        category=rng.choice(CATEGORIES),
+                        subcategory=subcategory,
+                        rating=rng.randint(1, 5),
+                        price=rng.randint(100, 8000),
+                        discount=rng.choice((0, 5, 10, 20, 40)),
+                        stock=rng.randint(0, 20),
+                        images=[{"url": f"https://fake.cloudinary.local/bench/{i}.jpg"}],
+                    )
+                )
+        Product.objects.bulk_create(rows, batch_size=batch_size)
+
+    rebuild_facets()
+    rebuild_rollups()
+    return {"vendors": vendors, "products_per_vendor": products, "products": len(rows)}
@@ -0,0 +1,111 @@
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from vendor.models import Product
+from orders.models import Order, OrderItem
+from .seed import seed, bench_users
+import tempfile
+import json
+import io
+import os
+
+
+class BenchmarkTest(TestCase):
+    def test_seed_replaces_the_dataset(self):
+        seed(vendors=2, products=5)
+        seed(vendors=3, products=4)
+
+        self.assertEqual(bench_users().count(), 3)
+        self.assertEqual(Product.objects.count(), 12)
+
+    def test_clearing_keeps_order_items(self):
+        seed(vendors=1, products=2)
+        product = Product.objects.first()
+        order = Order.objects.create(total=product.price, expires_at=timezone.now())
+        item = OrderItem.objects.create(order=order, product=product, name=product.name, quantity=1, price=product.price)
+
+        seed(vendors=1, products=2)
+
+        item.refresh_from_db()
+        self.assertIsNone(item.product)
+        self.assertFalse(Product.objects.filter(pk=product.pk).exists())
+
+    def test_client_run_writes_json_results(self):
+        output = os.path.join(tempfile.mkdtemp(), "results.json")
+
+        call_command(
+            "benchmark",
+            "--vendors=2",
+            "--products=3",
+            "--requests=2",
+            "--warmup=0",
+            "--scenarios=dashboard,store,edit_product,auth",
+            f"--output={output}",
+            stdout=io.StringIO(),
+        )
+
+        with open(output) as file:
+            report = json.load(file)
+        self.assertEqual(
+            [row["scenario"] for row in report["results"]], ["dashboard", "store", "edit_product", "auth"]
+        )
+        self.assertTrue(all(row["errors"] == 0 and row["requests"] == 2 for row in report["results"]))
+
+
+class ConnectionBenchmarkTest(TransactionTestCase):
+    # closes and reopens the connection, it can't run inside a test transaction
+
+    def test_persistent_connection_is_reused(self):
+        seed(vendors=1, products=2)
+        output = os.path.join(tempfile.mkdtemp(), "connections.json")
+
+        call_command("benchmark_connections", "--requests=3", f"--output={output}", stdout=io.StringIO())
+
+        with open(output) as file:
+            results = json.load(file)["results"]
+        self.assertEqual([row["connections"] for row in results], [3, 1])
+
+
+class AsyncBenchmarkTest(TransactionTestCase):
+    # the handlers serve the requests from other threads, they need committed rows
+
+    def test_wsgi_and_asgi_runs_save_every_product(self):
+        seed(vendors=1, products=2)
+        output = os.path.join(tempfile.mkdtemp(), "async.json")
+
+        call_command(
+            "benchmark_async",
+            "--requests=4",
+            "--threads=2",
+            "--images=1",
+            "--delay=0",
+            f"--output={output}",
+            stdout=io.StringIO(),
+        )
+
+        with open(output) as file:
+            results = json.load(file)["results"]
+        self.assertEqual([row["scenario"] for row in results], ["wsgi", "asgi"])
+        self.assertTrue(all(row["errors"] == 0 and row["requests"] == 4 for row in results))
+        self.assertEqual(Product.objects.count(), 2)
+
+    # the size of the upload thread pool must not hold back the event loop
+    @override_settings(IMAGE_UPLOAD_WORKERS=1)
+    def test_asgi_serves_more_requests_while_uploads_wait(self):
+        seed(vendors=1, products=2)
+        output = os.path.join(tempfile.mkdtemp(), "async.json")
+
+        call_command(
+            "benchmark_async",
+            "--requests=8",
+            "--threads=2",
+            "--images=2",
+            "--delay=0.2",
+            f"--output={output}",
+            stdout=io.StringIO(),
+        )
+
+        with open(output) as file:
+            wsgi, asgi = json.load(file)["results"]
+        self.assertEqual((wsgi["errors"], asgi["errors"]), (0, 0))
+        self.assertGreater(asgi["rps"], wsgi["rps"])
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'costumestore.settings')
+# async views run their queries on a new thread per request, a persistent
+# connection would be left open by every one of them
+os.environ.setdefault('DB_POOL_MODE', 'none')
 
 application = get_asgi_application()
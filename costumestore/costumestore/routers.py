@@ -0,0 +1,129 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+import random
+import time
+
+PIN_COOKIE = "primary_until"
+
+# set while the current request (or task) must read from the primary
+_pinned = ContextVar("pinned", default=False)
+# set once the current request has written
+_written = ContextVar("written", default=False)
+
+
+def pin_to_primary():
+    _pinned.set(True)
+
+
+@contextmanager
+def primary():
+    """Read everything inside the block from the primary."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+@contextmanager
+def unpinned_writes():
+    """
+    Writes inside the block don't pin the request to the primary, for rows
+    the user never reads back (e.g. query profiles).
+    """
+    tokens = _pinned.set(_pinned.get()), _written.set(_written.get())
+    try:
+        yield
+    finally:
+        _pinned.reset(tokens[0])
+        _written.reset(tokens[1])
+
+
+class ReplicaRouter:
+    """
+    Writes go to the primary ("default"), reads to a random replica from
+    DATABASE_REPLICAS. Reads stay on the primary inside transactions, after
+    the request has written anything, and while ReplicaPinMiddleware pins
+    the user there after their last write.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or _pinned.get() or connections["default"].in_atomic_block:
+            return "default"
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        _written.set(True)
+        _pinned.set(True)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+class ReplicaPinMiddleware:
+    """
+    Keep a user on the primary for REPLICA_PIN_SECONDS after a request that
+    wrote, so they read their own writes however far the replicas lag. The
+    deadline lives in a cookie, the session itself is read through the router.
+    Runs without a thread of its own in front of async views. It must be the
+    outermost middleware so that every write of the request is seen.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, req):
+        if iscoroutinefunction(self):
+            return self.__acall__(req)
+
+        tokens = self.start(req)
+        try:
+            return self.finish(self.get_response(req))
+        finally:
+            self.reset(tokens)
+
+    async def __acall__(self, req):
+        tokens = self.start(req)
+        try:
+            return self.finish(await self.get_response(req))
+        finally:
+            self.reset(tokens)
+
+    def start(self, req):
+        try:
+            pinned_until = float(req.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+
+        # only the cookie counts, a write made outside a request (a script,
+        # after an earlier response) may have left this thread pinned
+        return _pinned.set(pinned_until > time.time()), _written.set(False)
+
+    def finish(self, response):
+        if _written.get() and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PIN_COOKIE,
+                str(time.time() + settings.REPLICA_PIN_SECONDS),
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def reset(self, tokens):
+        pinned, written = tokens
+        _pinned.reset(pinned)
+        _written.reset(written)
@@ -1,7 +1,9 @@
 import os
+import django
 from pathlib import Path
 from dotenv import load_dotenv
 from django.contrib import messages
+from django.core.exceptions import ImproperlyConfigured
 
 # load env variables
 load_dotenv()
@@ -32,10 +34,15 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "website",
     "authentication",
     "vendor",
     "accounts",
+    "taskqueue",
+    "profiling",
+    "benchmarks",
+    "orders",
     "django_extensions",
     'cloudinary',
     'cloudinary_storage',
@@ -49,12 +56,59 @@ CLOUDINARY_STORAGE = {
 
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
+# product image uploads, see vendor/uploads.py
+# "inline" uploads in parallel inside the request, "background" saves the
+# product at once and uploads on a worker
+IMAGE_UPLOADER = os.getenv("IMAGE_UPLOADER", "vendor.uploads.CloudinaryUploader")
+IMAGE_UPLOAD_MODE = os.getenv("IMAGE_UPLOAD_MODE", "inline")
+IMAGE_UPLOAD_WORKERS = int(os.getenv("IMAGE_UPLOAD_WORKERS", 8))
+# uploads in flight at once on one event loop (async views), an upload
+# waiting on Cloudinary holds no thread so this can be much larger
+IMAGE_UPLOAD_ASYNC_LIMIT = int(os.getenv("IMAGE_UPLOAD_ASYNC_LIMIT", 256))
+# seconds an async upload (httpx) may wait on Cloudinary
+IMAGE_UPLOAD_TIMEOUT = float(os.getenv("IMAGE_UPLOAD_TIMEOUT", 60))
+
+# resized copies stored with every uploaded image (name: width in pixels),
+# listing pages pick one with srcset instead of loading the original
+IMAGE_VARIANTS = {"thumb": 160, "card": 480, "full": 1200}
+
+# bulk CSV product uploads, see vendor/bulk.py: files up to BULK_UPLOAD_INLINE_BYTES
+# are imported during the request, bigger ones by the worker
+BULK_UPLOAD_BATCH_SIZE = int(os.getenv("BULK_UPLOAD_BATCH_SIZE", 1000))
+BULK_UPLOAD_INLINE_BYTES = int(os.getenv("BULK_UPLOAD_INLINE_BYTES", 100_000))
+BULK_UPLOAD_MAX_ERRORS = int(os.getenv("BULK_UPLOAD_MAX_ERRORS", 1000))
+
+# background tasks, see taskqueue/queue.py, run with `manage.py run_worker`
+# uploads handed to the worker are spooled here, it must be shared with the workers
+TASK_SPOOL_DIR = os.getenv("TASK_SPOOL_DIR", os.path.join(BASE_DIR, "spool"))
+TASK_RETRY_BACKOFF = int(os.getenv("TASK_RETRY_BACKOFF", 10))
+TASK_RETRY_BACKOFF_MAX = int(os.getenv("TASK_RETRY_BACKOFF_MAX", 3600))
+TASK_LOCK_TIMEOUT = int(os.getenv("TASK_LOCK_TIMEOUT", 900))
+
+# per request query counts, see profiling/middleware.py, report with `manage.py query_report`
+# a request running the same statement QUERY_PROFILING_N_PLUS_ONE times or more is flagged
+QUERY_PROFILING = os.getenv("QUERY_PROFILING", "0") == "1"
+QUERY_PROFILING_SAMPLE_RATE = float(os.getenv("QUERY_PROFILING_SAMPLE_RATE", 0.05))
+QUERY_PROFILING_N_PLUS_ONE = int(os.getenv("QUERY_PROFILING_N_PLUS_ONE", 5))
+
+# vendor dashboard rollups, see vendor/rollups.py. Products with 1 to
+# VENDOR_LOW_STOCK units count as low on stock, run `manage.py rebuild_rollups` after changing it
+VENDOR_LOW_STOCK = int(os.getenv("VENDOR_LOW_STOCK", 5))
+
+# checkout, see orders/stock.py: stock is held for ORDER_RESERVATION_MINUTES
+# until the order is placed, expired orders are released in batches by the worker
+ORDER_RESERVATION_MINUTES = int(os.getenv("ORDER_RESERVATION_MINUTES", 15))
+ORDER_RELEASE_BATCH_SIZE = int(os.getenv("ORDER_RELEASE_BATCH_SIZE", 500))
+
 MIDDLEWARE = [
+    "costumestore.routers.ReplicaPinMiddleware",
+    "profiling.middleware.QueryProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "accounts.middleware.VendorMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -78,6 +132,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "orders.context_processors.cart",
             ],
         },
     },
@@ -100,6 +155,73 @@ DATABASES = {
     }
 }
 
+# database connections, DB_POOL_MODE:
+# "none"       a new connection per request (CONN_MAX_AGE=0)
+# "persistent" (default) each worker thread keeps its connection for
+#              DB_CONN_MAX_AGE seconds and checks it is alive before reuse,
+#              WSGI only (asgi.py defaults to "none")
+# "pool"       psycopg 3 connection pool shared by the threads of a process,
+#              needs Django 5.1+ and psycopg[pool]
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "persistent")
+
+if os.getenv("DB_SSLMODE"):
+    DATABASES["default"]["OPTIONS"] = {"sslmode": os.getenv("DB_SSLMODE")}
+
+if DB_POOL_MODE == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 600))
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+elif DB_POOL_MODE == "pool":
+    if django.VERSION < (5, 1):
+        raise ImproperlyConfigured("DB_POOL_MODE=pool needs Django 5.1 or later, use persistent")
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+        "timeout": int(os.getenv("DB_POOL_TIMEOUT", 10)),
+    }
+elif DB_POOL_MODE != "none":
+    raise ImproperlyConfigured(f"Unknown DB_POOL_MODE: {DB_POOL_MODE}")
+
+# read replicas, DB_REPLICAS="[name@]host[:port],..." (name defaults to DB_NAME).
+# Reads are routed to them by costumestore/routers.py, a user who just wrote
+# reads from the primary for REPLICA_PIN_SECONDS
+DATABASE_REPLICAS = []
+for number, replica in enumerate(filter(None, os.getenv("DB_REPLICAS", "").split(",")), 1):
+    name, _, address = replica.strip().rpartition("@")
+    host, _, port = address.partition(":")
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "NAME": name or DATABASES["default"]["NAME"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        # tests run against the primary only
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica{number}")
+
+DATABASE_ROUTERS = ["costumestore.routers.ReplicaRouter"]
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
+# cache backend from CACHE_BACKEND: "locmem" (default, one cache per process),
+# "file" (CACHE_LOCATION is a directory shared by the processes of one host)
+# or "redis" (CACHE_LOCATION is a redis:// url, shared by every host)
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": os.getenv(
+            "CACHE_LOCATION", os.path.join(BASE_DIR, "cache") if CACHE_BACKEND == "file" else ""
+        ),
+        "KEY_PREFIX": "costumestore",
+        "TIMEOUT": 300,
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
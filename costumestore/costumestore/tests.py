@@ -0,0 +1,101 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.db import transaction
+from vendor.models import Product
+from .routers import ReplicaRouter, ReplicaPinMiddleware, PIN_COOKIE, primary, unpinned_writes, _pinned
+import time
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], REPLICA_PIN_SECONDS=5)
+class ReplicaRouterTest(SimpleTestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        token = _pinned.set(False)
+        self.addCleanup(_pinned.reset, token)
+
+    def test_reads_go_to_a_replica(self):
+        self.assertEqual(self.router.db_for_read(Product), "replica1")
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        self.assertEqual(self.router.db_for_write(Product), "default")
+        self.assertEqual(self.router.db_for_read(Product), "default")
+
+    def test_reads_in_a_transaction_stay_on_the_primary(self):
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Product), "default")
+
+    def test_primary_block(self):
+        with primary():
+            self.assertEqual(self.router.db_for_read(Product), "default")
+        self.assertEqual(self.router.db_for_read(Product), "replica1")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(self.router.db_for_read(Product), "default")
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"], REPLICA_PIN_SECONDS=5)
+class ReplicaPinMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        token = _pinned.set(False)
+        self.addCleanup(_pinned.reset, token)
+
+    def run_request(self, view, cookies=None):
+        req = self.factory.get("/")
+        req.COOKIES.update(cookies or {})
+        return ReplicaPinMiddleware(view)(req)
+
+    def test_write_sets_the_pin_cookie(self):
+        def view(req):
+            self.router.db_for_write(Product)
+            return HttpResponse()
+
+        response = self.run_request(view)
+
+        self.assertGreater(float(response.cookies[PIN_COOKIE].value), time.time())
+
+    def test_pinned_user_reads_from_primary(self):
+        reads = []
+
+        def view(req):
+            reads.append(self.router.db_for_read(Product))
+            return HttpResponse()
+
+        self.run_request(view, {PIN_COOKIE: str(time.time() + 5)})
+        self.run_request(view, {PIN_COOKIE: str(time.time() - 1)})
+        self.run_request(view)
+
+        self.assertEqual(reads, ["default", "replica1", "replica1"])
+        self.assertFalse(_pinned.get())
+
+    def test_write_outside_a_request_does_not_pin_the_next_one(self):
+        reads = []
+
+        def view(req):
+            reads.append(self.router.db_for_read(Product))
+            return HttpResponse()
+
+        # e.g. a middleware wrapped around ReplicaPinMiddleware saving a row
+        self.router.db_for_write(Product)
+        response = self.run_request(view)
+
+        self.assertEqual(reads, ["replica1"])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_unpinned_writes(self):
+        reads = []
+
+        def view(req):
+            with unpinned_writes():
+                self.router.db_for_write(Product)
+            reads.append(self.router.db_for_read(Product))
+            return HttpResponse()
+
+        response = self.run_request(view)
+
+        self.assertEqual(reads, ["replica1"])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
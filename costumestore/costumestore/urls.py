@@ -6,5 +6,6 @@ urlpatterns = [
     path("auth/", include("authentication.urls")),
     path("vendor/", include("vendor.urls")),
     path("account/", include("accounts.urls")),
+    path("orders/", include("orders.urls")),
     path("admin/", admin.site.urls),
 ]
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from .models import Order, OrderItem
+
+
+class Items(admin.TabularInline):
+    model = OrderItem
+    extra = 0
+    raw_id_fields = ["product"]
+
+
+@admin.register(Order)
+class Orders(admin.ModelAdmin):
+    list_display = ["id", "user", "status", "total", "expires_at", "created_at"]
+    list_filter = ["status"]
+    raw_id_fields = ["user"]
+    inlines = [Items]
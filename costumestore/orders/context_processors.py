@@ -0,0 +1,6 @@
+from .cart import Cart
+
+
+def cart(req):
+    # item count for the header, straight from the session
+    return {"cart_count": len(Cart(req.session))}
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from orders.stock import release_expired
+
+
+class Command(BaseCommand):
+    help = "Give the stock held by expired pending orders back"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Orders released per transaction")
+
+    def handle(self, *args, **options):
+        released = release_expired(options["batch_size"])
+        self.stdout.write(f"Released {released} expired orders")
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import models
+from vendor.models import Product
+import uuid
+
+
+class Order(models.Model):
+    """
+    A checkout. While pending, the stock of its items is held (already taken
+    off Product.stock) until expires_at, then placed or released back.
+    """
+
+    STATUS = (
+        ("pending", "Pending"),
+        ("placed", "Placed"),
+        ("cancelled", "Cancelled"),
+        ("expired", "Expired"),
+    )
+
+    id = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="orders"
+    )
+    # owner of an order placed without logging in
+    session_key = models.CharField(max_length=40, blank=True, default="")
+    status = models.CharField(max_length=10, choices=STATUS, default="pending")
+    total = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    placed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "orders"
+        verbose_name = "Order"
+        verbose_name_plural = "Orders"
+        indexes = [
+            # the expiry sweep only looks at pending orders
+            models.Index(fields=["expires_at"], condition=models.Q(status="pending"), name="orders_pending_expiry_idx"),
+        ]
+
+
+class OrderItem(models.Model):
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, related_name="order_items")
+    name = models.CharField(max_length=200)
+    quantity = models.PositiveIntegerField()
+    # sale price per unit when the stock was reserved
+    price = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = "order_items"
+        verbose_name = "Order Item"
+        verbose_name_plural = "Order Items"
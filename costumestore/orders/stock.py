@@ -0,0 +1,216 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from taskqueue.queue import enqueue
+from website.cache import ALL_PRODUCTS, bump_catalog_version, product_scopes
+from website.facets import facet_keys, apply_deltas
+from vendor import rollups
+from datetime import timedelta
+from collections import Counter
+from .models import Order, OrderItem
+
+
+class OutOfStock(Exception):
+    def __init__(self, product_id):
+        super().__init__(f"Not enough stock left for product {product_id}")
+        self.product_id = product_id
+
+
+def product_values(vendor_id, category, subcategory, price, discount, stock):
+    return {
+        "vendor_id": vendor_id,
+        "category": category,
+        "subcategory": subcategory,
+        "price": price,
+        "discount": discount,
+        "stock": stock,
+    }
+
+
+def take_stock(product_id, quantity):
+    """
+    Take quantity units off a product with one conditional UPDATE, nothing
+    is read or locked beforehand so concurrent buyers of the same product
+    only wait for each other's statement. Returns (name, unit sale price,
+    (values before, values after)) or None when fewer than quantity units are left.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE products
+            SET stock = stock - %s, updated_at = statement_timestamp()
+            WHERE id = %s AND stock >= %s
+            RETURNING name, price - price * discount / 100, vendor_id, category, subcategory, price, discount, stock
+            """,
+            [quantity, product_id, quantity],
+        )
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+    name, sale_price, *values = row
+    after = product_values(*values)
+    return name, sale_price, ({**after, "stock": after["stock"] + quantity}, after)
+
+
+def restock(quantities):
+    """
+    Put {product_id: quantity} back in stock with one UPDATE. Returns
+    (values before, values after) of every product.
+    """
+    if not quantities:
+        return []
+
+    product_ids = sorted(quantities, key=str)
+    rows = ", ".join(["(%s::uuid, %s::integer)"] * len(product_ids))
+    params = [value for product_id in product_ids for value in (product_id, quantities[product_id])]
+
+    with connection.cursor() as cursor:
+        # lock the rows in the same order reserve_order takes them
+        cursor.execute("SELECT id FROM products WHERE id = ANY(%s) ORDER BY id FOR UPDATE", [product_ids])
+        cursor.execute(
+            f"""
+            UPDATE products
+            SET stock = products.stock + restock.quantity, updated_at = statement_timestamp()
+            FROM (VALUES {rows}) AS restock (id, quantity)
+            WHERE products.id = restock.id
+            RETURNING restock.quantity, vendor_id, category, subcategory, price, discount, products.stock
+            """,
+            params,
+        )
+        changes = []
+        for quantity, *values in cursor.fetchall():
+            after = product_values(*values)
+            changes.append(({**after, "stock": after["stock"] - quantity}, after))
+        return changes
+
+
+def stock_changed(changes):
+    """
+    Update what is derived from the stock after [(values before, values
+    after)] commits: the shop facets, which a sold out product leaves, and
+    the vendor rollups.
+    """
+    deltas = Counter()
+    scopes = set()
+    for before, after in changes:
+        deltas.subtract(facet_keys(before))
+        deltas.update(facet_keys(after))
+        # the vendor's store and the unfiltered shop follow every stock
+        # change, a category listing only when a product sells out or comes back
+        scopes.update((ALL_PRODUCTS, f"vendor:{after['vendor_id']}"))
+        if facet_keys(before) != facet_keys(after):
+            scopes.update(product_scopes(before, after))
+    apply_deltas(deltas)
+    if scopes:
+        bump_catalog_version(*sorted(scopes))
+
+    rollups.apply_deltas(rollups.deltas(changes))
+
+
+def schedule_release(expires_at):
+    # one sweep per minute of expiries, however many orders expire in it
+    minute = expires_at.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    enqueue(
+        "orders.release_expired",
+        key=f"orders.release_expired:{minute.isoformat()}",
+        delay=minute - timezone.now(),
+    )
+
+
+def reserve_order(items, user=None, session_key=""):
+    """
+    Hold the stock of {product_id: quantity} for ORDER_RESERVATION_MINUTES
+    in a pending order. Either every item is reserved or, raising OutOfStock,
+    none is.
+    """
+    items = {product_id: quantity for product_id, quantity in items.items() if quantity > 0}
+    if not items:
+        raise ValueError("Nothing to order")
+
+    lines = []
+    changes = []
+
+    with transaction.atomic():
+        # every checkout takes the product rows in id order, so two orders
+        # for the same products wait for each other instead of deadlocking
+        for product_id in sorted(items, key=str):
+            taken = take_stock(product_id, items[product_id])
+            if taken is None:
+                raise OutOfStock(product_id)
+
+            name, price, change = taken
+            lines.append(OrderItem(product_id=product_id, name=name, quantity=items[product_id], price=price))
+            changes.append(change)
+
+        order = Order.objects.create(
+            user=user,
+            session_key=session_key,
+            total=sum(line.price * line.quantity for line in lines),
+            expires_at=timezone.now() + timedelta(minutes=settings.ORDER_RESERVATION_MINUTES),
+        )
+        for line in lines:
+            line.order = order
+        OrderItem.objects.bulk_create(lines)
+
+        # after the commit, so concurrent checkouts don't queue up on the
+        # task row while holding their product rows
+        transaction.on_commit(lambda: schedule_release(order.expires_at))
+        transaction.on_commit(lambda: stock_changed(changes))
+
+    return order
+
+
+def confirm_order(order):
+    """Place a pending order, unless its reservation ran out first."""
+    now = timezone.now()
+    placed = Order.objects.filter(pk=order.pk, status="pending", expires_at__gt=now).update(
+        status="placed", placed_at=now
+    )
+    return placed == 1
+
+
+def release(order_ids, status):
+    # call inside a transaction with the pending orders locked
+    quantities = Counter()
+    items = OrderItem.objects.filter(order_id__in=order_ids, product__isnull=False)
+    for product_id, quantity in items.values_list("product_id", "quantity"):
+        quantities[product_id] += quantity
+
+    changes = restock(quantities)
+    Order.objects.filter(pk__in=order_ids).update(status=status)
+    transaction.on_commit(lambda: stock_changed(changes))
+
+
+def cancel_order(order):
+    with transaction.atomic():
+        pending = list(
+            Order.objects.select_for_update().filter(pk=order.pk, status="pending").values_list("pk", flat=True)
+        )
+        if not pending:
+            return False
+        release(pending, "cancelled")
+    return True
+
+
+def release_expired(batch_size=None):
+    """
+    Give the stock of expired pending orders back, batch_size orders per
+    transaction. Orders another sweep is releasing are skipped. Returns the
+    number of orders released.
+    """
+    batch_size = batch_size or settings.ORDER_RELEASE_BATCH_SIZE
+    released = 0
+
+    while True:
+        with transaction.atomic():
+            expired = list(
+                Order.objects.filter(status="pending", expires_at__lte=timezone.now())
+                .order_by("expires_at")
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not expired:
+                return released
+            release(expired, "expired")
+        released += len(expired)
@@ -0,0 +1,7 @@
+from taskqueue.queue import task
+from .stock import release_expired
+
+
+@task("orders.release_expired")
+def release_expired_orders():
+    release_expired()
@@ -0,0 +1,260 @@
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from vendor.tests import create_vendor, PRODUCT_DATA
+from vendor.models import Product
+from website.facets import get_facets
+from vendor.rollups import get_rollups
+from taskqueue.models import Task
+from datetime import timedelta
+from .models import Order
+from .cart import SESSION_KEY, MAX_QUANTITY
+from .stock import OutOfStock, reserve_order, confirm_order, cancel_order, release_expired
+import multiprocessing
+import random
+
+
+def create_product(vendor, **fields):
+    return Product.objects.create(vendor=vendor, images=[], **{**PRODUCT_DATA, **fields})
+
+
+class ReserveOrderTest(TestCase):
+    def setUp(self):
+        self.user, self.vendor = create_vendor()
+        self.saree = create_product(self.vendor, stock=5)
+        self.kurta = create_product(self.vendor, name="Cotton Kurta", stock=1, price=500, discount=0)
+
+    def stock(self, product):
+        product.refresh_from_db()
+        return product.stock
+
+    def test_reserve_takes_stock_at_sale_price(self):
+        order = reserve_order({self.saree.id: 2, self.kurta.id: 1}, user=self.user)
+
+        self.assertEqual(order.status, "pending")
+        self.assertEqual(order.total, 2 * 1080 + 500)
+        self.assertEqual(self.stock(self.saree), 3)
+        self.assertEqual(self.stock(self.kurta), 0)
+
+    def test_out_of_stock_reserves_nothing(self):
+        with self.assertRaises(OutOfStock) as raised:
+            reserve_order({self.saree.id: 2, self.kurta.id: 2})
+
+        self.assertEqual(raised.exception.product_id, self.kurta.id)
+        self.assertEqual(self.stock(self.saree), 5)
+        self.assertFalse(Order.objects.exists())
+
+    def test_sold_out_product_leaves_the_facets(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = reserve_order({self.kurta.id: 1, self.saree.id: 2})
+        self.assertEqual(get_facets()["category"]["women"], 1)
+        rollup = get_rollups(self.vendor)[1]
+        self.assertEqual((rollup["units"], rollup["out_of_stock"]), (3, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel_order(order)
+        self.assertEqual(get_facets()["category"]["women"], 2)
+        self.assertEqual(get_rollups(self.vendor)[1]["units"], 6)
+
+    def test_every_stock_change_shows_on_the_store_page(self):
+        self.client.force_login(self.user)
+        etag = self.client.get(reverse("store"))["ETag"]
+        updated_at = self.saree.updated_at
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order = reserve_order({self.saree.id: 1})
+        self.saree.refresh_from_db()
+        self.assertGreater(self.saree.updated_at, updated_at)
+        response = self.client.get(reverse("store"), HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Silk Saree")
+
+        updated_at = self.saree.updated_at
+        with self.captureOnCommitCallbacks(execute=True):
+            cancel_order(order)
+        self.saree.refresh_from_db()
+        self.assertGreater(self.saree.updated_at, updated_at)
+
+    def test_release_is_scheduled_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_order({self.saree.id: 1})
+            reserve_order({self.saree.id: 1})
+
+        self.assertEqual(Task.objects.filter(name="orders.release_expired").count(), 1)
+
+    def test_cancel_gives_stock_back_once(self):
+        order = reserve_order({self.saree.id: 2})
+
+        self.assertTrue(cancel_order(order))
+        self.assertFalse(cancel_order(order))
+        self.assertEqual(self.stock(self.saree), 5)
+        self.assertFalse(confirm_order(order))
+
+    def test_expired_orders_are_released_in_batches(self):
+        orders = [reserve_order({self.saree.id: 1}) for _ in range(3)]
+        placed = reserve_order({self.saree.id: 1})
+        self.assertTrue(confirm_order(placed))
+        Order.objects.filter(pk__in=[order.pk for order in orders]).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        with self.assertNumQueries(3 * 7 + 3):
+            # per batch: savepoint, select, items, lock, restock, mark, release
+            self.assertEqual(release_expired(batch_size=1), 3)
+
+        self.assertEqual(self.stock(self.saree), 4)
+        self.assertEqual(Order.objects.filter(status="expired").count(), 3)
+        self.assertFalse(confirm_order(orders[0]))
+
+    def test_checkout_and_place_order(self):
+        response = self.client.post(
+            reverse("checkout"), {"product": [self.saree.id, self.kurta.id], "quantity": [2, 1]}
+        )
+        order = Order.objects.get()
+        self.assertRedirects(response, reverse("order_page", args=[order.id]))
+        self.assertContains(self.client.get(reverse("order_page", args=[order.id])), "Cotton Kurta")
+
+        self.client.post(reverse("order_page", args=[order.id]), {"action": "confirm"})
+        order.refresh_from_db()
+        self.assertEqual(order.status, "placed")
+
+    def test_checkout_out_of_stock(self):
+        response = self.client.post(reverse("checkout"), {"product": [self.kurta.id], "quantity": [3]})
+
+        self.assertRedirects(
+            response, reverse("product_page", args=[self.kurta.id]), fetch_redirect_response=False
+        )
+        self.assertContains(self.client.get(response.url), "not enough Cotton Kurta")
+
+    def test_checkout_quantity_out_of_range(self):
+        for quantity in (0, MAX_QUANTITY + 1, 2**40):
+            response = self.client.post(reverse("checkout"), {"product": [self.saree.id], "quantity": [quantity]})
+
+            self.assertRedirects(response, reverse("cart_page"), fetch_redirect_response=False)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.stock(self.saree), 5)
+
+    def test_orders_of_other_visitors_are_hidden(self):
+        order = reserve_order({self.saree.id: 1}, session_key="someone-else")
+
+        self.assertEqual(self.client.get(reverse("order_page", args=[order.id])).status_code, 404)
+
+
+class CartTest(TestCase):
+    def setUp(self):
+        self.user, self.vendor = create_vendor()
+        self.products = [create_product(self.vendor, name=f"Saree {number}") for number in range(5)]
+
+    def add(self, product, quantity=1):
+        return self.client.post(reverse("cart_add"), {"product": product.id, "quantity": quantity})
+
+    def cart_page_queries(self):
+        with CaptureQueriesContext(connections["default"]) as queries:
+            response = self.client.get(reverse("cart_page"))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_session_holds_only_ids_and_quantities(self):
+        self.add(self.products[0], 2)
+        self.add(self.products[0])
+        self.add(self.products[1])
+
+        self.assertEqual(
+            self.client.session[SESSION_KEY], {self.products[0].id.hex: 3, self.products[1].id.hex: 1}
+        )
+
+    def test_cart_page_queries_do_not_grow_with_items(self):
+        self.add(self.products[0])
+        one_item = self.cart_page_queries()
+
+        for product in self.products[1:]:
+            self.add(product, 2)
+        response = self.client.get(reverse("cart_page"))
+
+        self.assertEqual(self.cart_page_queries(), one_item)
+        self.assertEqual(response.context["subtotal"], 1080 + 4 * 2 * 1080)
+        self.assertContains(response, "Saree 4")
+
+    def test_update_and_remove(self):
+        self.add(self.products[0])
+        self.add(self.products[1])
+
+        self.client.post(
+            reverse("cart_update"),
+            {"product": [self.products[0].id, self.products[1].id], "quantity": [4, 1], "remove": self.products[1].id},
+        )
+
+        self.assertEqual(self.client.session[SESSION_KEY], {self.products[0].id.hex: 4})
+
+    def test_invalid_remove_leaves_the_cart(self):
+        self.add(self.products[0])
+
+        response = self.client.post(reverse("cart_update"), {"remove": "not-a-product"})
+
+        self.assertRedirects(response, reverse("cart_page"), fetch_redirect_response=False)
+        self.assertEqual(self.client.session[SESSION_KEY], {self.products[0].id.hex: 1})
+
+    def test_deleted_products_drop_out(self):
+        self.add(self.products[0])
+        self.add(self.products[1])
+        self.products[0].delete()
+
+        response = self.client.get(reverse("cart_page"))
+
+        self.assertEqual(len(response.context["lines"]), 1)
+        self.assertEqual(list(self.client.session[SESSION_KEY]), [self.products[1].id.hex])
+
+    def test_checkout_empties_the_cart(self):
+        self.add(self.products[0], 2)
+        self.add(self.products[1])
+
+        self.client.post(reverse("checkout"), {"product": [self.products[0].id], "quantity": [2]})
+
+        self.assertEqual(list(self.client.session[SESSION_KEY]), [self.products[1].id.hex])
+
+    def test_adding_to_the_cart_changes_the_etag(self):
+        url = reverse("product_page", args=[self.products[0].id])
+        etag = self.client.get(url)["ETag"]
+
+        self.add(self.products[0])
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+def buy(product_ids, attempts):
+    # runs in a child process, each order takes one unit of every product
+    placed = out_of_stock = 0
+    for _ in range(attempts):
+        items = {product_id: 1 for product_id in random.sample(product_ids, len(product_ids))}
+        try:
+            reserve_order(items)
+            placed += 1
+        except OutOfStock:
+            out_of_stock += 1
+    connections.close_all()
+    return placed, out_of_stock
+
+
+class ConcurrentReserveTest(TransactionTestCase):
+    # the children need their own connections and committed rows
+
+    def test_many_processes_never_oversell(self):
+        user, vendor = create_vendor()
+        products = [create_product(vendor, stock=40), create_product(vendor, stock=60)]
+        product_ids = [product.id for product in products]
+
+        # forked children must not share the parent's connection
+        connections.close_all()
+        with multiprocessing.get_context("fork").Pool(8) as pool:
+            results = pool.starmap(buy, [(product_ids, 10)] * 8)
+
+        placed = sum(result[0] for result in results)
+        self.assertEqual(placed, 40)
+        self.assertEqual(sum(result[1] for result in results), 80 - 40)
+        self.assertEqual([self.stock(product) for product in products], [0, 20])
+        self.assertEqual(Order.objects.count(), 40)
+
+    def stock(self, product):
+        product.refresh_from_db()
+        return product.stock
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("cart/add", views.cart_add, name="cart_add"),
+    path("cart/update", views.cart_update, name="cart_update"),
+    path("checkout", views.checkout, name="checkout"),
+    path("<uuid:id>", views.order_page, name="order_page"),
+]
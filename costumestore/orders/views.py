@@ -0,0 +1,121 @@
+from django.contrib import messages
+from django.http import Http404
+from django.shortcuts import render, redirect, get_object_or_404
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+from vendor.models import Product
+from collections import Counter
+from .models import Order
+from .cart import Cart, MAX_QUANTITY
+from .stock import OutOfStock, reserve_order, confirm_order, cancel_order
+import uuid
+
+
+def owner(req):
+    if req.user.is_authenticated:
+        return {"user": req.user}
+
+    if not req.session.session_key:
+        req.session.save()
+    return {"session_key": req.session.session_key}
+
+
+def get_order(req, id):
+    order = get_object_or_404(Order, pk=id)
+    if req.user.is_authenticated:
+        owned = order.user_id == req.user.pk
+    else:
+        owned = bool(order.session_key) and order.session_key == req.session.session_key
+
+    if not owned:
+        raise Http404("No such order")
+    return order
+
+
+def posted_items(req):
+    # one (product, quantity) pair per item, raises ValueError
+    items = Counter()
+    for product, quantity in zip(req.POST.getlist("product"), req.POST.getlist("quantity")):
+        items[uuid.UUID(product)] += int(quantity)
+    return items
+
+
+@require_POST
+def cart_add(req):
+    try:
+        items = posted_items(req)
+    except ValueError:
+        messages.error(req, "Invalid quantity")
+        return redirect("cart_page")
+
+    cart = Cart(req.session)
+    for product_id, quantity in items.items():
+        if quantity > 0:
+            cart.add(product_id, quantity)
+    return redirect("cart_page")
+
+
+@require_POST
+def cart_update(req):
+    try:
+        items = posted_items(req)
+        remove = uuid.UUID(req.POST["remove"]) if req.POST.get("remove") else None
+    except ValueError:
+        messages.error(req, "Invalid quantity")
+        return redirect("cart_page")
+
+    cart = Cart(req.session)
+    for product_id, quantity in items.items():
+        cart.set(product_id, quantity)
+    if remove:
+        cart.remove(remove)
+    return redirect("cart_page")
+
+
+@require_POST
+def checkout(req):
+    try:
+        items = posted_items(req)
+        # the cart never holds more, a bigger number would overflow the stock column
+        if not all(0 < quantity <= MAX_QUANTITY for quantity in items.values()):
+            raise ValueError("Quantity out of range")
+    except ValueError:
+        messages.error(req, "Invalid quantity")
+        return redirect("cart_page")
+
+    try:
+        order = reserve_order(items, **owner(req))
+    except OutOfStock as e:
+        name = Product.objects.filter(pk=e.product_id).values_list("name", flat=True).first()
+        messages.error(req, f"Sorry, there is not enough {name or 'stock'} left")
+        return redirect("product_page", id=e.product_id) if name else redirect("cart_page")
+    except ValueError:
+        messages.error(req, "Your cart is empty")
+        return redirect("cart_page")
+
+    Cart(req.session).remove(*items)
+    return redirect("order_page", id=order.id)
+
+
+def order_page(req, id):
+    order = get_order(req, id)
+
+    if req.method == "POST":
+        action = req.POST.get("action")
+        if action == "confirm" and not confirm_order(order):
+            messages.error(req, "Your reservation has expired, please check out again")
+        elif action == "cancel":
+            cancel_order(order)
+        return redirect("order_page", id=order.id)
+
+    remaining = (order.expires_at - timezone.now()).total_seconds()
+    return render(
+        req,
+        "orders/order.html",
+        context={
+            "order": order,
+            "items": order.items.all(),
+            "minutes_left": max(int(remaining // 60), 0),
+            "expired": order.status == "pending" and remaining <= 0,
+        },
+    )
@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import QueryProfile
+
+
+@admin.register(QueryProfile)
+class QueryProfiles(admin.ModelAdmin):
+    list_display = ["view", "method", "status", "queries", "duplicates", "db_time", "total_time", "created_at"]
+    list_filter = ["view", "method"]
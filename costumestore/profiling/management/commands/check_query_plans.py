@@ -0,0 +1,131 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from accounts.models import Vendor
+from vendor.models import Product
+from profiling.middleware import fingerprint
+import json
+
+DUMMY_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+def pages(product, vendor):
+    """(name, method, url, data, logged in as the vendor) of every page checked."""
+    return [
+        ("home_page", "get", reverse("home_page"), None, False),
+        ("shop_page", "get", reverse("shop_page"), None, False),
+        ("shop_page:category", "get", reverse("shop_page"), {"category": product.category}, False),
+        (
+            "shop_page:subcategory",
+            "get",
+            reverse("shop_page"),
+            {"category": product.category, "subcategory": product.subcategory, "sort": "price_low"},
+            False,
+        ),
+        ("shop_page:vendor", "get", reverse("shop_page"), {"vendor": vendor.id, "sort": "rating"}, False),
+        ("search_page", "get", reverse("search_page"), {"q": product.name}, False),
+        ("search_suggestions", "get", reverse("search_suggestions"), {"q": product.name[:3]}, False),
+        ("product_page", "get", reverse("product_page", args=[product.id]), None, False),
+        ("auth", "post", reverse("auth"), {"email": vendor.user.email}, False),
+        ("activate", "get", reverse("activate", args=["no-such-token"]), None, False),
+        ("dashboard", "get", reverse("dashboard"), None, True),
+        ("store", "get", reverse("store"), None, True),
+        ("edit_product", "get", reverse("edit_product", args=[product.id]), None, True),
+        ("vendor_profile", "get", reverse("vendor_profile"), None, True),
+    ]
+
+
+class Recorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith("SELECT"):
+            self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+def seq_scans(plan):
+    """Relations read by a sequential scan anywhere in an EXPLAIN (FORMAT JSON) plan."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found += seq_scans(child)
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every page with the test client, EXPLAIN the SELECTs they run and "
+        "fail when one of them scans a large table sequentially"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=10000,
+            help="Only tables with at least this many (estimated) rows count as large",
+        )
+        parser.add_argument("--verbose-plans", action="store_true", help="Print the plan of every query")
+
+    def handle(self, *args, **options):
+        vendor = Vendor.objects.filter(Product__isnull=False).select_related("user").first()
+        if vendor is None:
+            raise CommandError("Needs at least one vendor with products, load or seed some first")
+        product = Product.objects.filter(vendor=vendor, stock__gt=0).first() or vendor.Product.first()
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r'")
+            sizes = dict(cursor.fetchall())
+
+        problems = []
+        checked = set()
+
+        # no cache, every page has to run its queries; everything the pages
+        # write (sessions, logins) is rolled back at the end
+        with override_settings(CACHES=DUMMY_CACHE, DEBUG=False, ALLOWED_HOSTS=["testserver"]):
+            with transaction.atomic():
+                anonymous = Client()
+                vendor_client = Client()
+                vendor_client.force_login(vendor.user)
+
+                for name, method, url, data, login in pages(product, vendor):
+                    recorder = Recorder()
+                    client = vendor_client if login else anonymous
+                    with connection.execute_wrapper(recorder):
+                        try:
+                            getattr(client, method)(url, data)
+                        except Exception as e:
+                            self.stderr.write(f"{name}: {e}")
+
+                    for sql, params in recorder.queries:
+                        key = (name, fingerprint(sql))
+                        if key in checked:
+                            continue
+                        checked.add(key)
+
+                        with connection.cursor() as cursor:
+                            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                            plan = cursor.fetchone()[0]
+                        plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+                        if options["verbose_plans"]:
+                            self.stdout.write(f"{name}: {sql}\n{json.dumps(plan, indent=2)}\n")
+
+                        for table in seq_scans(plan):
+                            if sizes.get(table, 0) >= options["min_rows"]:
+                                problems.append((name, table, sql))
+
+                transaction.set_rollback(True)
+
+        self.stdout.write(f"Checked {len(checked)} queries on {len(pages(product, vendor))} pages")
+        for name, table, sql in problems:
+            self.stdout.write(self.style.ERROR(f"{name}: sequential scan on {table}\n    {sql[:300]}"))
+
+        if problems:
+            raise CommandError(f"{len(problems)} queries scan large tables sequentially")
+        self.stdout.write(self.style.SUCCESS("No sequential scans on large tables"))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max
+from django.utils import timezone
+from datetime import timedelta
+from collections import Counter
+from profiling.models import QueryProfile
+
+
+class Command(BaseCommand):
+    help = "Summarise the sampled query profiles per view and list the N+1 queries found"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24, help="Only look at the last N hours")
+        parser.add_argument("--limit", type=int, default=20, help="Number of views and N+1 queries to show")
+        parser.add_argument("--clear", action="store_true", help="Delete the profiles after reporting")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options["hours"])
+        profiles = QueryProfile.objects.filter(created_at__gte=since)
+
+        views = (
+            profiles.values("view", "method")
+            .annotate(
+                requests=Count("id"),
+                avg_queries=Avg("queries"),
+                max_queries=Max("queries"),
+                avg_duplicates=Avg("duplicates"),
+                avg_db_time=Avg("db_time"),
+                avg_total_time=Avg("total_time"),
+            )
+            .order_by("-avg_queries")[: options["limit"]]
+        )
+
+        self.stdout.write(
+            f"{'view':40} {'method':6} {'requests':>8} {'queries':>8} {'max':>5} {'dupes':>6} {'db ms':>8} {'total ms':>9}"
+        )
+        for row in views:
+            self.stdout.write(
+                f"{row['view'][:40]:40} {row['method']:6} {row['requests']:>8} "
+                f"{row['avg_queries']:>8.1f} {row['max_queries']:>5} {row['avg_duplicates']:>6.1f} "
+                f"{row['avg_db_time']:>8.1f} {row['avg_total_time']:>9.1f}"
+            )
+
+        suspects = Counter()
+        for view, n_plus_one in profiles.exclude(n_plus_one=[]).values_list("view", "n_plus_one"):
+            for query in n_plus_one:
+                suspects[(view, query["sql"])] += 1
+
+        if suspects:
+            self.stdout.write("\nN+1 queries (requests seen in, view, statement):")
+            for (view, sql), seen in suspects.most_common(options["limit"]):
+                self.stdout.write(f"{seen:>6}  {view}  {sql[:200]}")
+
+        if options["clear"]:
+            deleted, _ = profiles.delete()
+            self.stdout.write(f"\nDeleted {deleted} profiles")
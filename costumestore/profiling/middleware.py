@@ -0,0 +1,109 @@
+from contextlib import ExitStack
+from collections import Counter
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from costumestore.routers import unpinned_writes
+from .models import QueryProfile
+import logging
+import random
+import time
+import re
+
+logger = logging.getLogger("profiling")
+
+IN_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+SAVEPOINT = re.compile(r"^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b", re.IGNORECASE)
+
+
+def fingerprint(sql):
+    """
+    Shape of a statement with its values taken out, so that the same query
+    run with different parameters counts as a duplicate.
+    """
+    sql = IN_LIST.sub("(%s, ...)", sql)
+    sql = LITERAL.sub("?", sql)
+    return " ".join(sql.split())
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    def summary(self, threshold):
+        counts = Counter(fingerprint(sql) for sql, _ in self.queries if not SAVEPOINT.match(sql))
+        return {
+            "queries": len(self.queries),
+            "duplicates": sum(counts.values()) - len(counts),
+            "db_time": sum(duration for _, duration in self.queries) * 1000,
+            "n_plus_one": [
+                {"sql": sql, "count": count}
+                for sql, count in counts.most_common()
+                if count >= threshold
+            ],
+        }
+
+
+class QueryProfilingMiddleware:
+    """
+    Count the queries and database time of every request and report them in
+    a Server-Timing header. A sample of requests, and every request with
+    N+1 queries, is stored as a QueryProfile for `manage.py query_report`.
+    Removed from the middleware chain unless QUERY_PROFILING is on.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, req):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(req)
+
+        total_time = (time.perf_counter() - start) * 1000
+        summary = recorder.summary(settings.QUERY_PROFILING_N_PLUS_ONE)
+
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={summary["db_time"]:.1f};desc="{summary["queries"]} queries"',
+                f"app;dur={total_time:.1f}",
+            ]
+        )
+
+        view = req.resolver_match.view_name if req.resolver_match else "unresolved"
+        if summary["n_plus_one"]:
+            logger.warning(
+                "N+1 queries in %s: %s",
+                view,
+                "; ".join(f'{q["count"]}x {q["sql"]}' for q in summary["n_plus_one"]),
+            )
+
+        if summary["n_plus_one"] or random.random() < settings.QUERY_PROFILING_SAMPLE_RATE:
+            try:
+                with unpinned_writes():
+                    QueryProfile.objects.create(
+                        view=view,
+                        method=req.method,
+                        path=req.path[:500],
+                        status=response.status_code,
+                        total_time=total_time,
+                        **summary,
+                    )
+            except Exception as e:
+                print(e)
+
+        return response
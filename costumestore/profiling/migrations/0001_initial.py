@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view', models.CharField(max_length=200)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=500)),
+                ('status', models.PositiveSmallIntegerField()),
+                ('queries', models.PositiveIntegerField()),
+                ('duplicates', models.PositiveIntegerField()),
+                ('db_time', models.FloatField(help_text='milliseconds')),
+                ('total_time', models.FloatField(help_text='milliseconds')),
+                ('n_plus_one', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Query Profile',
+                'verbose_name_plural': 'Query Profiles',
+                'db_table': 'query_profiles',
+                'indexes': [models.Index(fields=['view', '-created_at'], name='query_profiles_view_idx')],
+            },
+        ),
+    ]
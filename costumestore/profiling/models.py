@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class QueryProfile(models.Model):
+    view = models.CharField(max_length=200)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    status = models.PositiveSmallIntegerField()
+    queries = models.PositiveIntegerField()
+    duplicates = models.PositiveIntegerField()
+    db_time = models.FloatField(help_text="milliseconds")
+    total_time = models.FloatField(help_text="milliseconds")
+    # [{"sql": fingerprint, "count": n}] of the statements repeated N+1 style
+    n_plus_one = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "query_profiles"
+        verbose_name = "Query Profile"
+        verbose_name_plural = "Query Profiles"
+        indexes = [models.Index(fields=["view", "-created_at"], name="query_profiles_view_idx")]
+
+    def __str__(self):
+        return f"{self.method} {self.view} ({self.queries} queries)"
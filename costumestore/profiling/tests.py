@@ -0,0 +1,83 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from accounts.models import Vendor
+from vendor.tests import create_vendor, PRODUCT_DATA
+from vendor.models import Product
+from .management.commands.check_query_plans import seq_scans
+from .middleware import QueryRecorder, fingerprint
+from .models import QueryProfile
+import io
+
+
+class FingerprintTest(TestCase):
+    def test_values_and_in_lists_are_removed(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM products WHERE id IN (%s, %s, %s) LIMIT 21"),
+            fingerprint("SELECT *   FROM products WHERE id IN (%s, %s) LIMIT 5"),
+        )
+
+
+@override_settings(QUERY_PROFILING=True, QUERY_PROFILING_SAMPLE_RATE=1, QUERY_PROFILING_N_PLUS_ONE=3)
+class QueryProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        self.user, self.vendor = create_vendor()
+        self.client.force_login(self.user)
+
+    def test_server_timing_header_and_sampled_profile(self):
+        response = self.client.get(reverse("dashboard"))
+
+        self.assertIn('db;dur=', response["Server-Timing"])
+        profile = QueryProfile.objects.get()
+        self.assertEqual(profile.view, "dashboard")
+        self.assertGreater(profile.queries, 0)
+
+    def test_repeated_queries_are_flagged(self):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            for _ in range(3):
+                Vendor.objects.get(user=self.user)
+            Product.objects.count()
+
+        summary = recorder.summary(threshold=3)
+
+        self.assertEqual(summary["queries"], 4)
+        self.assertEqual(summary["duplicates"], 2)
+        self.assertEqual(len(summary["n_plus_one"]), 1)
+        self.assertEqual(summary["n_plus_one"][0]["count"], 3)
+
+    def test_report(self):
+        self.client.get(reverse("dashboard"))
+        out = io.StringIO()
+        call_command("query_report", stdout=out)
+        self.assertIn("dashboard", out.getvalue())
+
+
+class DisabledTest(TestCase):
+    def test_no_header_when_disabled(self):
+        response = self.client.get(reverse("home_page"))
+        self.assertNotIn("Server-Timing", response)
+        self.assertFalse(QueryProfile.objects.exists())
+
+
+class QueryPlanTest(TestCase):
+    def test_seq_scans_are_found_in_nested_plans(self):
+        plan = {
+            "Node Type": "Nested Loop",
+            "Plans": [
+                {"Node Type": "Index Scan", "Relation Name": "vendors"},
+                {"Node Type": "Hash", "Plans": [{"Node Type": "Seq Scan", "Relation Name": "products"}]},
+            ],
+        }
+
+        self.assertEqual(seq_scans(plan), ["products"])
+
+    def test_command_passes_on_small_tables(self):
+        user, vendor = create_vendor()
+        Product.objects.create(vendor=vendor, images=[], **PRODUCT_DATA)
+
+        out = io.StringIO()
+        call_command("check_query_plans", stdout=out, stderr=io.StringIO())
+
+        self.assertIn("No sequential scans on large tables", out.getvalue())
@@ -1,41 +1,229 @@
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
 from accounts.models import Vendor
 from vendor.models import Product
-import math
+from benchmarks.seed import delete_products
+import itertools
+import json
+import time
+import uuid
 import csv
+import io
 import os
 
+# columns of data/products.csv
+NAME, CATEGORY, SUBCATEGORY, IMAGE, RATING, PRICE, DISCOUNT = range(7)
+
+COPY_COLUMNS = (
+    "id",
+    "vendor_id",
+    "name",
+    "colors",
+    "dimension",
+    "category",
+    "subcategory",
+    "rating",
+    "price",
+    "discount",
+    "stock",
+    "images",
+    "image_status",
+    "description",
+    "created_at",
+    "updated_at",
+)
+
+
+def parse_options(args):
+    """
+    runscript arguments, e.g.
+    python manage.py runscript load_products --script-args copy batch=10000 file=data/products.csv
+
+    "keep-indexes" keeps the secondary indexes in place while loading.
+    """
+    options = {"mode": "bulk", "batch": 5000, "file": "data/products.csv", "keep_indexes": False}
+    for arg in args:
+        if arg in ("bulk", "copy"):
+            options["mode"] = arg
+        elif arg == "keep-indexes":
+            options["keep_indexes"] = True
+        elif "=" in arg:
+            key, value = arg.split("=", 1)
+            options[key] = int(value) if key == "batch" else value
+    return options
+
+
+def read_products(location):
+    """
+    Stream parsed rows from the csv file, skipping the header and any row
+    without a usable price.
+    """
+    with open(location, newline="") as file:
+        reader = csv.reader(file)
+        next(reader, None)
+
+        for record in reader:
+            try:
+                yield {
+                    "name": record[NAME][:200],
+                    "category": record[CATEGORY],
+                    "subcategory": record[SUBCATEGORY],
+                    "image": record[IMAGE],
+                    "rating": min(round(float(record[RATING] or 0)), 5),
+                    "price": int(float(record[PRICE])),
+                    "discount": int(float(record[DISCOUNT] or 0)),
+                }
+            except (ValueError, IndexError):
+                continue
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def insert_bulk(batch, vendor_ids):
+    Product.objects.bulk_create(
+        [
+            Product(
+                vendor_id=next(vendor_ids),
+                name=row["name"],
+                category=row["category"],
+                subcategory=row["subcategory"],
+                images=[{"url": row["image"]}],
+                rating=row["rating"],
+                price=row["price"],
+                discount=row["discount"],
+            )
+            for row in batch
+        ]
+    )
+
+
+def array_literal(values):
+    # postgres array literal of json values, e.g. {"{\"url\": \"...\"}"}
+    items = (json.dumps(value).replace("\\", "\\\\").replace('"', '\\"') for value in values)
+    return "{" + ",".join(f'"{item}"' for item in items) + "}"
+
+
+def insert_copy(batch, vendor_ids):
+    now = timezone.now().isoformat()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+
+    for row in batch:
+        writer.writerow(
+            (
+                uuid.uuid4(),
+                next(vendor_ids),
+                row["name"],
+                "",
+                "",
+                row["category"],
+                row["subcategory"],
+                row["rating"],
+                row["price"],
+                row["discount"],
+                1,
+                array_literal([{"url": row["image"]}]),
+                "ready",
+                "",
+                now,
+                now,
+            )
+        )
+
+    buffer.seek(0)
+    sql = f"COPY products ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):
+            # psycopg2
+            raw.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def drop_indexes():
+    """
+    Drop the secondary indexes of the products table and return the
+    statements that recreate them. Building an index once over the loaded
+    table is much cheaper than maintaining it row by row during the load.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT i.indexname, i.indexdef FROM pg_indexes i
+            WHERE i.tablename = 'products' AND NOT EXISTS (
+                SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname
+            )
+            """
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+
+    return [definition for _, definition in indexes]
+
+
+def create_indexes(definitions):
+    with connection.cursor() as cursor:
+        # run the deferred foreign key checks first, postgres refuses to
+        # build an index on a table with pending trigger events
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        # sorts for the index builds stay in memory instead of spilling to disk
+        cursor.execute("SET LOCAL maintenance_work_mem = '256MB'")
+        for definition in definitions:
+            cursor.execute(definition)
+
+
+def run(*args):
+    options = parse_options(args)
 
-def run():
     # accessing data file
     directory = os.path.dirname(__file__)
-    dataset_location = os.path.join(directory, "data/products.csv")
-
-    with open(dataset_location) as file:
-        read_file = csv.reader(file)
-        products = list(read_file)
-        products_per_vendor = math.floor((len(products) / Vendor.objects.all().count()))
-
-        Product.objects.all().delete()
-
-        for index, vendor in enumerate(Vendor.objects.all()):
-            for i in range(
-                products_per_vendor * index, products_per_vendor * (index + 1)
-            ):
-                if i == 0:
-                    pass
-                else:
-                    try:
-                        product = Product.objects.create(
-                            vendor=vendor,
-                            name=products[i][0],
-                            category=products[i][1],
-                            subcategory=products[i][2],
-                            images=[{"url": products[i][3]}],
-                            rating=products[i][4],
-                            price=products[i][5],
-                            discount=products[i][6],
-                        )
-
-                        print(f"Product:[{product.name}] added successfully")
-                    except Exception as e:
-                        print(e, products[i])
+    dataset_location = os.path.join(directory, options["file"])
+
+    # vendors are read once and handed out round-robin
+    vendor_ids = list(Vendor.objects.values_list("id", flat=True))
+    if not vendor_ids:
+        print("No vendors found, run load_vendors first")
+        return
+    vendor_ids = itertools.cycle(vendor_ids)
+
+    insert = insert_copy if options["mode"] == "copy" else insert_bulk
+    loaded = 0
+    start = time.perf_counter()
+
+    with transaction.atomic():
+        # signals are rebuilt in bulk below, no need to fire them per row.
+        # order items keep their rows with no product, as on_delete=SET_NULL does
+        delete_products(Product.objects.all())
+
+        indexes = [] if options["keep_indexes"] else drop_indexes()
+
+        for batch in batches(read_products(dataset_location), options["batch"]):
+            insert(batch, vendor_ids)
+            loaded += len(batch)
+
+            elapsed = time.perf_counter() - start
+            print(f"{loaded} products loaded, {loaded / elapsed:,.0f} rows/s")
+
+        if indexes:
+            print(f"Rebuilding {len(indexes)} indexes")
+            index_start = time.perf_counter()
+            create_indexes(indexes)
+            print(f"Indexes rebuilt in {time.perf_counter() - index_start:.2f}s")
+
+    elapsed = time.perf_counter() - start
+    print(f"Loaded {loaded} products in {elapsed:.2f}s ({loaded / elapsed:,.0f} rows/s, {options['mode']})")
+
+    # bulk inserts skip the Product signals, rebuild what they maintain
+    call_command("rebuild_facets")
+    call_command("rebuild_rollups")
+    call_command("rebuild_search_index")
@@ -1,38 +1,132 @@
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
 from accounts.models import Vendor
 from authentication.models import User
+import itertools
+import time
 import csv
 import os
 
+PASSWORD = "Vendor@123"
 
-def run():
-    # accessing data file
-    directory = os.path.dirname(__file__)
-    dataset_location = os.path.join(directory, "data/vendors.csv")
-
-    with open(dataset_location) as file:
-        read_file = csv.reader(file)
-        count = 1
-        User.objects.exclude(role="admin").delete()
-        for record in read_file:
-            if count != 1:
-                try:
-                    user = User.objects.create_user(
-                        email=record[3], 
-                        password="Vendor@123", 
-                        name=record[1], 
-                        phone=record[2],
+# columns of data/vendors.csv
+SHOP_NAME, NAME, PHONE, EMAIL = range(4)
+
+
+def parse_options(args):
+    """
+    runscript arguments, e.g.
+    python manage.py runscript load_vendors --script-args benchmark copies=50
+
+    modes: "bulk" (default), "legacy" (create_user per row) and "benchmark"
+    which times both. "copies" repeats the csv rows with unique emails to
+    get a measurable amount of data.
+    """
+    options = {"mode": "bulk", "batch": 1000, "file": "data/vendors.csv", "copies": 1}
+    for arg in args:
+        if arg in ("bulk", "legacy", "benchmark"):
+            options["mode"] = arg
+        elif "=" in arg:
+            key, value = arg.split("=", 1)
+            options[key] = int(value) if key in ("batch", "copies") else value
+    return options
+
+
+def read_vendors(location, copies=1):
+    with open(location, newline="") as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        records = list(reader)
+
+    for copy in range(copies):
+        for record in records:
+            email = record[EMAIL] if copy == 0 else f"{copy}.{record[EMAIL]}"
+            yield {
+                "shop_name": record[SHOP_NAME],
+                "name": record[NAME],
+                "phone": record[PHONE],
+                "email": User.objects.normalize_email(email),
+            }
+
+
+def clear_vendors():
+    User.objects.exclude(role="admin").delete()
+
+
+def load_legacy(rows):
+    """The original loader, one create_user (and its signal) per vendor."""
+    for row in rows:
+        try:
+            user = User.objects.create_user(
+                email=row["email"],
+                password=PASSWORD,
+                name=row["name"],
+                phone=row["phone"],
+                role="vendor",
+                is_active=True,
+            )
+
+            if user:
+                vendor = Vendor.objects.get(user=user)
+                vendor.shop_name = row["shop_name"]
+                vendor.save()
+
+        except Exception as e:
+            print(e, row)
+
+
+def load_bulk(rows, batch_size):
+    """
+    Hash the shared password once and insert users and their vendors in
+    batches. bulk_create does not send post_save, so create_profile (and the
+    activation email) is skipped, seeded vendors are created already active.
+    """
+    password = make_password(PASSWORD)
+    iterator = iter(rows)
+
+    with transaction.atomic():
+        while batch := list(itertools.islice(iterator, batch_size)):
+            users = User.objects.bulk_create(
+                [
+                    User(
+                        email=row["email"],
+                        password=password,
+                        name=row["name"],
+                        phone=row["phone"],
                         role="vendor",
-                        is_active = True
+                        is_active=True,
                     )
-                    
-                    if user:
-                        vendor = Vendor.objects.get(user=user)
-                        vendor.shop_name = record[0]
-                        vendor.save()
-                        
-                        print(f"Vendors:[{user.name}] added successfully")
-                
-                except Exception as e:
-                    print(e, record)
-
-            count += 1
+                    for row in batch
+                ]
+            )
+            Vendor.objects.bulk_create(
+                [Vendor(user=user, shop_name=row["shop_name"]) for user, row in zip(users, batch)]
+            )
+
+
+def timed(load, rows, *args):
+    rows = list(rows)
+    clear_vendors()
+    start = time.perf_counter()
+    load(rows, *args)
+    elapsed = time.perf_counter() - start
+    print(f"{load.__name__}: {len(rows)} vendors in {elapsed:.2f}s ({len(rows) / elapsed:,.0f} rows/s)")
+    return elapsed
+
+
+def run(*args):
+    options = parse_options(args)
+
+    # accessing data file
+    directory = os.path.dirname(__file__)
+    dataset_location = os.path.join(directory, options["file"])
+    rows = list(read_vendors(dataset_location, options["copies"]))
+
+    if options["mode"] == "benchmark":
+        legacy = timed(load_legacy, rows)
+        bulk = timed(load_bulk, rows, options["batch"])
+        print(f"bulk loader is {legacy / bulk:.1f}x faster")
+    elif options["mode"] == "legacy":
+        timed(load_legacy, rows)
+    else:
+        timed(load_bulk, rows, options["batch"])
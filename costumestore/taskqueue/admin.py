@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import Task
+
+
+@admin.register(Task)
+class Tasks(admin.ModelAdmin):
+    list_display = ["id", "name", "status", "attempts", "run_at"]
+    list_filter = ["status", "name"]
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from taskqueue.queue import run_batch
+import time
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10)
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            results = run_batch(options["batch_size"])
+
+            if results:
+                self.stdout.write(f"Ran {len(results)} tasks, {results.count(False)} failed")
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
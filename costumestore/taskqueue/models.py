@@ -0,0 +1,36 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    STATUS = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    )
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS, default="queued")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    idempotency_key = models.CharField(max_length=200, null=True, blank=True, unique=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "tasks"
+        verbose_name = "Task"
+        verbose_name_plural = "Tasks"
+        indexes = [
+            # the worker only ever looks at due, queued tasks
+            models.Index(fields=["run_at"], condition=models.Q(status="queued"), name="tasks_queued_idx"),
+            models.Index(fields=["locked_at"], condition=models.Q(status="running"), name="tasks_running_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} [{self.status}]"
@@ -0,0 +1,112 @@
+from costumestore.routers import primary
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.db.models import F, Q
+from django.utils import timezone
+from datetime import timedelta
+from .models import Task
+import traceback
+import random
+
+_registry = {}
+
+
+def task(name, max_attempts=5):
+    """
+    Register a function as a background job. It is called with the task
+    payload as keyword arguments and must be safe to run more than once.
+    """
+
+    def register(func):
+        _registry[name] = (func, max_attempts)
+        return func
+
+    return register
+
+
+def enqueue(name, payload=None, key=None, delay=None):
+    """
+    Queue a job. Inside a transaction the task row commits (or rolls back)
+    together with the data it refers to. A job enqueued again with the same
+    idempotency ``key`` is not duplicated, the existing task is returned.
+    """
+    if name not in _registry:
+        raise ValueError(f"Unknown task: {name}")
+
+    fields = {
+        "name": name,
+        "payload": payload or {},
+        "max_attempts": _registry[name][1],
+        "run_at": timezone.now() + (delay or timedelta()),
+    }
+
+    if key is None:
+        return Task.objects.create(**fields)
+
+    try:
+        with transaction.atomic():
+            return Task.objects.create(idempotency_key=key, **fields)
+    except IntegrityError:
+        return Task.objects.get(idempotency_key=key)
+
+
+def backoff(attempts):
+    base = settings.TASK_RETRY_BACKOFF
+    delay = min(base * 2 ** (attempts - 1), settings.TASK_RETRY_BACKOFF_MAX)
+    # jitter keeps retries of tasks that failed together from bunching up
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def claim(batch_size):
+    """
+    Lock a batch of due tasks for this worker. SKIP LOCKED lets any number
+    of workers poll the table without waiting on each other; tasks left
+    running by a worker that died are picked up again after TASK_LOCK_TIMEOUT.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(Q(status="queued", run_at__lte=now) | Q(status="running", locked_at__lt=stale))
+            .order_by("run_at")[:batch_size]
+        )
+        Task.objects.filter(id__in=[t.id for t in tasks]).update(
+            status="running", locked_at=now, attempts=F("attempts") + 1
+        )
+
+    for t in tasks:
+        t.attempts += 1
+    return tasks
+
+
+def execute(t):
+    func, _ = _registry.get(t.name, (None, None))
+
+    try:
+        if func is None:
+            raise ValueError(f"Unknown task: {t.name}")
+        # tasks act on rows written moments ago, replicas may not have them yet
+        with primary():
+            func(**t.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if t.attempts >= t.max_attempts:
+            Task.objects.filter(id=t.id).update(status="failed", last_error=error, locked_at=None)
+        else:
+            Task.objects.filter(id=t.id).update(
+                status="queued",
+                last_error=error,
+                locked_at=None,
+                run_at=timezone.now() + backoff(t.attempts),
+            )
+        return False
+
+    Task.objects.filter(id=t.id).update(status="done", locked_at=None)
+    return True
+
+
+def run_batch(batch_size=10):
+    tasks = claim(batch_size)
+    return [execute(t) for t in tasks]
@@ -0,0 +1,58 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from .queue import task, enqueue, run_batch
+from .models import Task
+
+calls = []
+
+
+@task("tests.record", max_attempts=3)
+def record(value):
+    calls.append(value)
+
+
+@task("tests.explode", max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+@override_settings(TASK_RETRY_BACKOFF=10, TASK_RETRY_BACKOFF_MAX=60)
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_queued_task_runs_once(self):
+        enqueue("tests.record", {"value": 1})
+
+        self.assertEqual(run_batch(), [True])
+        self.assertEqual(run_batch(), [])
+        self.assertEqual(calls, [1])
+        self.assertEqual(Task.objects.get().status, "done")
+
+    def test_idempotency_key_does_not_duplicate(self):
+        first = enqueue("tests.record", {"value": 1}, key="record-1")
+        second = enqueue("tests.record", {"value": 1}, key="record-1")
+
+        self.assertEqual(first.id, second.id)
+        run_batch()
+        self.assertEqual(calls, [1])
+
+    def test_failed_task_is_retried_with_backoff_then_marked_failed(self):
+        enqueue("tests.explode")
+
+        self.assertEqual(run_batch(), [False])
+        failed = Task.objects.get()
+        self.assertEqual(failed.status, "queued")
+        self.assertGreater(failed.run_at, timezone.now())
+        self.assertIn("boom", failed.last_error)
+
+        # not due yet
+        self.assertEqual(run_batch(), [])
+
+        Task.objects.update(run_at=timezone.now())
+        self.assertEqual(run_batch(), [False])
+        self.assertEqual(Task.objects.get().status, "failed")
+
+    def test_unknown_task_cannot_be_enqueued(self):
+        with self.assertRaises(ValueError):
+            enqueue("tests.missing")
@@ -0,0 +1,99 @@
+from django.core.cache import cache
+import hashlib
+import random
+import math
+import json
+import time
+import uuid
+
+CATALOG_VERSION_KEY = "catalog-version"
+
+# scope of the listings that span every product (the unfiltered shop), bumped
+# by every product change whatever its category
+ALL_PRODUCTS = "all"
+
+
+def version_keys(scopes):
+    return [CATALOG_VERSION_KEY] + [f"{CATALOG_VERSION_KEY}:{scope}" for scope in scopes]
+
+
+def catalog_version(*scopes):
+    """
+    Version stamped into cached catalog keys: the global version followed
+    by one per scope ("all", "vendor:<id>", "category:<name>") the entry is built
+    from. Bumping a scope orphans the entries that depend on it and no
+    others, bumping the global version orphans everything.
+    """
+    keys = version_keys(scopes)
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, None)
+        versions.update(cache.get_many(missing))
+    return ".".join(versions.get(key, "") for key in keys)
+
+
+def bump_catalog_version(*scopes):
+    """Replace the versions of ``scopes``, or the global version when none are given."""
+    keys = version_keys(scopes)[1:] if scopes else [CATALOG_VERSION_KEY]
+    cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+
+def product_scopes(*values):
+    """Scopes a change touches, given the field values (or None) of the products before and after."""
+    scopes = set()
+    for value in values:
+        if value:
+            scopes.add(ALL_PRODUCTS)
+            scopes.add(f"vendor:{value['vendor_id']}")
+            scopes.add(f"category:{value['category']}")
+    return sorted(scopes)
+
+
+def catalog_key(name, scopes, *parts):
+    digest = hashlib.md5(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    return f"catalog:{catalog_version(*scopes)}:{name}:{digest}"
+
+
+def get_or_compute(key, compute, timeout, beta=1.0, lock_timeout=10, wait=2.0):
+    """
+    cache.get_or_set() that protects the database from stampedes.
+
+    A hit is recomputed a little before it expires, with a probability that
+    grows as expiry nears and with how long the value took to build
+    ("probabilistic early expiration"), so one request refreshes a hot key
+    while the others keep reading it. On a miss only the request holding
+    the lock computes, the others wait up to `wait` seconds for its result.
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires_at = entry
+        if time.time() - delta * beta * math.log(random.random() or 1e-12) < expires_at:
+            return value
+        return _compute(key, compute, timeout)
+
+    lock = f"lock:{key}"
+    if cache.add(lock, 1, lock_timeout):
+        try:
+            return _compute(key, compute, timeout)
+        finally:
+            cache.delete(lock)
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+
+    # the lock holder is too slow (or died), don't keep the user waiting
+    return compute()
+
+
+def _compute(key, compute, timeout):
+    start = time.time()
+    value = compute()
+    delta = time.time() - start
+    cache.set(key, (value, delta, time.time() + timeout), timeout)
+    return value
@@ -0,0 +1,103 @@
+from django.db.models import F, ExpressionWrapper, IntegerField
+from vendor.pagination import KeysetPaginator
+from vendor.models import Product
+from .cache import ALL_PRODUCTS, catalog_key, get_or_compute
+
+PAGE_SIZE = 12
+
+# seconds a catalog page stays cached, any product change invalidates it sooner
+CATALOG_TIMEOUT = 300
+
+CATEGORIES = ("women", "men", "accessories")
+
+PRICE_RANGES = ((0, 500), (500, 1000), (1000, 2000), (2000, 5000), (5000, None))
+
+# columns rendered by the product grid (plus created_at for the keyset
+# cursor and updated_at for the card fragment cache key), nothing else is
+# read from the table
+CARD_FIELDS = (
+    "id", "name", "category", "subcategory", "price", "discount", "rating", "created_at", "updated_at"
+)
+
+# every ordering ends with the primary key so that it is stable and
+# matches one of the composite indexes declared on Product
+SORTS = {
+    "newest": ("-created_at", "-id"),
+    "rating": ("-rating", "-id"),
+    "price_low": ("price", "id"),
+    "price_high": ("-price", "-id"),
+}
+
+
+def filter_products(filters):
+    products = Product.objects.filter(stock__gt=0)
+
+    if filters.get("vendor"):
+        products = products.filter(vendor_id=filters["vendor"])
+    if filters.get("category"):
+        products = products.filter(category=filters["category"])
+        if filters.get("subcategory"):
+            products = products.filter(subcategory=filters["subcategory"])
+
+    if filters.get("min_price") is not None:
+        products = products.filter(price__gte=filters["min_price"])
+    # exclusive like the PRICE_RANGES buckets the facet counts use, a price
+    # on an edge is listed under one range only
+    if filters.get("max_price") is not None:
+        products = products.filter(price__lt=filters["max_price"])
+    if filters.get("min_discount"):
+        products = products.filter(discount__gte=filters["min_discount"])
+    if filters.get("min_rating"):
+        products = products.filter(rating__gte=filters["min_rating"])
+
+    return products
+
+
+def sale_price():
+    return ExpressionWrapper(F("price") - F("price") * F("discount") / 100, output_field=IntegerField())
+
+
+def product_cards(products, *fields):
+    # the first image comes with its variants and placeholder for srcset
+    return products.values(*CARD_FIELDS, *fields, image=F("images__0"), sale_price=sale_price())
+
+
+def filter_scopes(filters):
+    """Catalog version scopes the products listed for ``filters`` can come from."""
+    if filters.get("vendor"):
+        return [f"vendor:{filters['vendor']}"]
+    if filters.get("category"):
+        return [f"category:{filters['category']}"]
+    # categories are free text, the unfiltered listing can't name them all
+    return [ALL_PRODUCTS]
+
+
+def get_catalog_page(filters):
+    """
+    Return one page of in-stock products for the shop grid. Pages are keyset
+    paginated on the selected sort, so neither an OFFSET nor a COUNT over the
+    whole catalog is ever run.
+    """
+    ordering = SORTS.get(filters.get("sort") or "newest", SORTS["newest"])
+    paginator = KeysetPaginator(product_cards(filter_products(filters)), PAGE_SIZE, ordering)
+
+    return paginator.page(after=filters.get("after"), before=filters.get("before"))
+
+
+def get_cached_catalog_page(filters):
+    """
+    get_catalog_page() through the cache. The page is stored as a plain
+    dict, the KeysetPage holds on to its (unevaluated) queryset.
+    """
+
+    def build():
+        page = get_catalog_page(filters)
+        return {
+            "object_list": list(page.object_list),
+            "has_next": page.has_next,
+            "has_previous": page.has_previous,
+            "next_cursor": page.next_cursor,
+            "previous_cursor": page.previous_cursor,
+        }
+
+    return get_or_compute(catalog_key("page", filter_scopes(filters), filters), build, CATALOG_TIMEOUT)
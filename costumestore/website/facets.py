@@ -0,0 +1,140 @@
+from django.db import connection, transaction
+from django.db.models import Count
+from vendor.models import Product
+from .catalog import PRICE_RANGES
+from .models import FacetCount
+from .cache import bump_catalog_version
+from collections import Counter
+
+ALL_SCOPE = "all"
+
+FACET_FIELDS = ("vendor_id", "category", "subcategory", "price", "stock")
+
+
+def price_bucket(price):
+    for low, high in PRICE_RANGES:
+        if high is None or price < high:
+            return str(low)
+    return str(PRICE_RANGES[-1][0])
+
+
+def facet_keys(values):
+    """
+    Facet rows a product counts towards, given its field values. Products
+    out of stock are not listed in the shop and count towards nothing.
+    """
+    if not values or values["stock"] <= 0:
+        return []
+
+    keys = []
+    for scope in (ALL_SCOPE, str(values["vendor_id"])):
+        keys.append((scope, "category", "", values["category"]))
+        keys.append((scope, "subcategory", values["category"], values["subcategory"]))
+        keys.append((scope, "price", "", price_bucket(values["price"])))
+    return keys
+
+
+def product_values(product):
+    return {field: getattr(product, field) for field in FACET_FIELDS}
+
+
+def loaded_values(product):
+    loaded = getattr(product, "_loaded_values", None)
+    if loaded is None:
+        return None
+
+    if not all(field in loaded for field in FACET_FIELDS):
+        # loaded with only()/defer(), read what the row holds before the save
+        return Product.objects.filter(pk=product.pk).values(*FACET_FIELDS).first()
+    return {field: loaded[field] for field in FACET_FIELDS}
+
+
+def apply_deltas(deltas):
+    # sorted so concurrent writers lock the rows (the "all" ones are shared
+    # by every product) in the same order and can't deadlock
+    deltas = sorted((key, delta) for key, delta in deltas.items() if delta)
+    if not deltas:
+        return
+
+    # one upsert for every changed row instead of a read-modify-write per facet
+    rows = ", ".join(["(%s, %s, %s, %s, %s)"] * len(deltas))
+    params = [value for key, delta in deltas for value in (*key, delta)]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO facet_counts (scope, facet, parent, value, count)
+            VALUES {rows}
+            ON CONFLICT (scope, facet, parent, value)
+            DO UPDATE SET count = facet_counts.count + EXCLUDED.count
+            """,
+            params,
+        )
+
+
+def product_saved(product, old_values):
+    deltas = Counter()
+    deltas.subtract(facet_keys(old_values))
+    deltas.update(facet_keys(product_values(product)))
+    apply_deltas(deltas)
+
+
+def product_deleted(product):
+    deltas = Counter()
+    deltas.subtract(facet_keys(product_values(product)))
+    apply_deltas(deltas)
+
+
+def get_facets(vendor_id=None):
+    """
+    Facet counts for the shop or one vendor, read straight from the
+    precomputed rows: {"category": {...}, "subcategory": {category: {...}}, "price": {...}}
+    """
+    scope = str(vendor_id) if vendor_id else ALL_SCOPE
+    facets = {"category": {}, "subcategory": {}, "price": {}}
+
+    rows = FacetCount.objects.filter(scope=scope, count__gt=0)
+    for facet, parent, value, count in rows.values_list("facet", "parent", "value", "count"):
+        if facet == "subcategory":
+            facets["subcategory"].setdefault(parent, {})[value] = count
+        else:
+            facets[facet][value] = count
+
+    return facets
+
+
+def rebuild_facets():
+    """
+    Recount every facet from the products table, used after bulk loads that
+    bypass model signals and to repair any drift.
+    """
+    counts = Counter()
+    in_stock = Product.objects.filter(stock__gt=0).order_by()
+
+    for field, parent in (("category", None), ("subcategory", "category")):
+        group = ["vendor_id", field] + ([parent] if parent else [])
+        for row in in_stock.values(*group).annotate(total=Count("id")):
+            parent_value = row[parent] if parent else ""
+            counts[(str(row["vendor_id"]), field, parent_value, row[field])] += row["total"]
+            counts[(ALL_SCOPE, field, parent_value, row[field])] += row["total"]
+
+    for low, high in PRICE_RANGES:
+        bucket = in_stock.filter(price__gte=low)
+        if high is not None:
+            bucket = bucket.filter(price__lt=high)
+        for row in bucket.values("vendor_id").annotate(total=Count("id")):
+            counts[(str(row["vendor_id"]), "price", "", str(low))] += row["total"]
+            counts[(ALL_SCOPE, "price", "", str(low))] += row["total"]
+
+    rows = [
+        FacetCount(scope=scope, facet=facet, parent=parent, value=value, count=count)
+        for (scope, facet, parent, value), count in counts.items()
+    ]
+
+    with transaction.atomic():
+        FacetCount.objects.all().delete()
+        FacetCount.objects.bulk_create(rows, batch_size=5000)
+
+    # bulk loads rebuild the facets and skip the Product signals
+    bump_catalog_version()
+    return len(rows)
@@ -0,0 +1,21 @@
+from django import forms
+
+
+class CatalogFilters(forms.Form):
+    SORT_CHOICES = (
+        ("newest", "Newness"),
+        ("rating", "Average rating"),
+        ("price_low", "Price: Low to High"),
+        ("price_high", "Price: High to Low"),
+    )
+
+    vendor = forms.UUIDField(required=False)
+    category = forms.CharField(max_length=100, required=False)
+    subcategory = forms.CharField(max_length=100, required=False)
+    min_price = forms.IntegerField(min_value=0, required=False)
+    max_price = forms.IntegerField(min_value=0, required=False)
+    min_discount = forms.IntegerField(min_value=0, max_value=100, required=False)
+    min_rating = forms.IntegerField(min_value=0, max_value=5, required=False)
+    sort = forms.ChoiceField(choices=SORT_CHOICES, required=False)
+    after = forms.CharField(max_length=500, required=False)
+    before = forms.CharField(max_length=500, required=False)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from website.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = "Recount the shop facet counts (category, subcategory, price) from the products table"
+
+    def handle(self, *args, **options):
+        rows = rebuild_facets()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} facet counts"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from vendor.models import Product
+from website.search import update_search_vectors, build_suggestions
+
+
+class Command(BaseCommand):
+    help = "Recompute product search vectors and the autocomplete suggestion table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--suggestions-only",
+            action="store_true",
+            help="Only rebuild the autocomplete suggestions",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if not options["suggestions_only"]:
+            updated = 0
+            ids = Product.objects.values_list("id", flat=True).order_by()
+            batch = []
+            for product_id in ids.iterator(chunk_size=batch_size):
+                batch.append(product_id)
+                if len(batch) == batch_size:
+                    updated += update_search_vectors(Product.objects.filter(pk__in=batch))
+                    batch = []
+            if batch:
+                updated += update_search_vectors(Product.objects.filter(pk__in=batch))
+
+            self.stdout.write(f"Updated search vectors of {updated} products")
+
+        prefixes = build_suggestions(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Built suggestions for {prefixes} prefixes"))
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=36)),
+                ('facet', models.CharField(max_length=20)),
+                ('parent', models.CharField(blank=True, default='', max_length=100)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Facet Count',
+                'verbose_name_plural': 'Facet Counts',
+                'db_table': 'facet_counts',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchSuggestion',
+            fields=[
+                ('prefix', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('terms', models.JSONField(default=list)),
+            ],
+            options={
+                'verbose_name': 'Search Suggestion',
+                'verbose_name_plural': 'Search Suggestions',
+                'db_table': 'search_suggestions',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='facetcount',
+            constraint=models.UniqueConstraint(fields=('scope', 'facet', 'parent', 'value'), name='facet_counts_unique_key'),
+        ),
+    ]
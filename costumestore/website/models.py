@@ -1,3 +1,37 @@
 from django.db import models
 
-# Create your models here.
+
+class SearchSuggestion(models.Model):
+    """
+    Precomputed autocomplete table: one row per typed prefix holding the
+    best matching terms, so a suggestion lookup is a single primary key read.
+    """
+
+    prefix = models.CharField(max_length=20, primary_key=True)
+    terms = models.JSONField(default=list)
+
+    class Meta:
+        db_table = "search_suggestions"
+        verbose_name = "Search Suggestion"
+        verbose_name_plural = "Search Suggestions"
+
+
+class FacetCount(models.Model):
+    """
+    Number of in-stock products per facet value, kept for the whole shop
+    (scope "all") and for every vendor (scope = vendor id).
+    """
+
+    scope = models.CharField(max_length=36)
+    facet = models.CharField(max_length=20)
+    parent = models.CharField(max_length=100, blank=True, default="")
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "facet_counts"
+        verbose_name = "Facet Count"
+        verbose_name_plural = "Facet Counts"
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "facet", "parent", "value"], name="facet_counts_unique_key"),
+        ]
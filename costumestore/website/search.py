@@ -0,0 +1,126 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db.models import F, FloatField
+from django.db import transaction
+from django.db.models.functions import Cast
+from vendor.pagination import KeysetPaginator
+from vendor.models import Product
+from .catalog import product_cards
+from .models import SearchSuggestion
+from collections import Counter
+import heapq
+import re
+
+PAGE_SIZE = 12
+
+SEARCH_CONFIG = "english"
+
+# weighted document searched by the shop: name first, then the category
+# tags and finally the free text description
+PRODUCT_VECTOR = (
+    SearchVector("name", weight="A", config=SEARCH_CONFIG)
+    + SearchVector("category", "subcategory", weight="B", config=SEARCH_CONFIG)
+    + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+)
+
+# fields that make up the search document, saves touching none of them
+# do not need the vector recomputed
+VECTOR_FIELDS = {"name", "category", "subcategory", "description"}
+
+# minimum word similarity for the typo tolerant fallback
+TRIGRAM_THRESHOLD = 0.3
+
+SUGGESTION_MIN_PREFIX = 2
+SUGGESTION_MAX_PREFIX = 20
+SUGGESTION_LIMIT = 8
+
+WORD_RE = re.compile(r"[a-z0-9]{3,}")
+
+
+def update_search_vectors(queryset):
+    return queryset.update(search_vector=PRODUCT_VECTOR)
+
+
+def full_text_matches(products, query):
+    search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+    return products.filter(search_vector=search_query).annotate(
+        rank=Cast(SearchRank(F("search_vector"), search_query), FloatField())
+    )
+
+
+def trigram_matches(products, query):
+    matches = products.filter(name__trigram_word_similar=query).annotate(
+        rank=Cast(TrigramWordSimilarity(query, "name"), FloatField())
+    )
+    return matches.filter(rank__gte=TRIGRAM_THRESHOLD)
+
+
+def search_products(query, after=None, before=None, fuzzy=False):
+    """
+    Ranked full text search over in-stock products. When the query matches
+    nothing (usually a typo) the product names are matched by trigram word
+    similarity instead, which is served by the pg_trgm index. The page's
+    ``fuzzy`` tells which of the two it came from, the next pages have to
+    be asked for with the same ``fuzzy``.
+    """
+    products = Product.objects.filter(stock__gt=0)
+
+    if not fuzzy:
+        # rank is cast to double precision so the keyset cursor round-trips exactly
+        page = KeysetPaginator(
+            product_cards(full_text_matches(products, query), "rank"), PAGE_SIZE, ("-rank", "-id")
+        ).page(after=after, before=before)
+
+        # an empty first page means no match at all, no separate exists() query
+        # (whose LIMIT 1 plan is a sequential scan over the table)
+        if after or before or page.object_list:
+            page.fuzzy = False
+            return page
+        after = before = None
+
+    page = KeysetPaginator(
+        product_cards(trigram_matches(products, query), "rank"), PAGE_SIZE, ("-rank", "-id")
+    ).page(after=after, before=before)
+    page.fuzzy = True
+    return page
+
+
+def get_suggestions(prefix):
+    prefix = prefix.strip().lower()[:SUGGESTION_MAX_PREFIX]
+    if len(prefix) < SUGGESTION_MIN_PREFIX:
+        return []
+
+    suggestion = SearchSuggestion.objects.filter(prefix=prefix).first()
+    return suggestion.terms if suggestion else []
+
+
+def build_suggestions(batch_size=2000):
+    """
+    Rebuild the autocomplete table from the words used in product names and
+    categories, keeping the most frequent terms for every prefix.
+    """
+    counts = Counter()
+    rows = Product.objects.values_list("name", "category", "subcategory")
+    for name, category, subcategory in rows.iterator(chunk_size=batch_size):
+        counts.update(WORD_RE.findall(name.lower()))
+        counts[category.lower()] += 1
+        if subcategory:
+            counts[subcategory.lower()] += 1
+
+    prefixes = {}
+    for term, count in counts.items():
+        for size in range(SUGGESTION_MIN_PREFIX, min(len(term), SUGGESTION_MAX_PREFIX) + 1):
+            heap = prefixes.setdefault(term[:size], [])
+            if len(heap) < SUGGESTION_LIMIT:
+                heapq.heappush(heap, (count, term))
+            else:
+                heapq.heappushpop(heap, (count, term))
+
+    suggestions = [
+        SearchSuggestion(prefix=prefix, terms=[term for _, term in sorted(heap, reverse=True)])
+        for prefix, heap in prefixes.items()
+    ]
+
+    with transaction.atomic():
+        SearchSuggestion.objects.all().delete()
+        SearchSuggestion.objects.bulk_create(suggestions, batch_size=batch_size)
+    return len(suggestions)
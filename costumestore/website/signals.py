@@ -0,0 +1,45 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from vendor.models import Product
+from .search import update_search_vectors, VECTOR_FIELDS
+from .cache import bump_catalog_version, product_scopes
+from . import facets
+
+
+# keep the full text search document of a product in sync with its fields
+@receiver(post_save, sender=Product)
+def update_product_search_vector(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields and not VECTOR_FIELDS.intersection(update_fields):
+        return
+
+    update_search_vectors(Product.objects.filter(pk=instance.pk))
+
+
+# move the product between facet counts when a save changes its facets
+@receiver(pre_save, sender=Product)
+def remember_facet_values(sender, instance, **kwargs):
+    instance._facet_values = None if instance._state.adding else facets.loaded_values(instance)
+
+
+@receiver(post_save, sender=Product)
+def update_facet_counts(sender, instance, created, **kwargs):
+    facets.product_saved(instance, getattr(instance, "_facet_values", None))
+
+
+@receiver(post_delete, sender=Product)
+def remove_facet_counts(sender, instance, **kwargs):
+    facets.product_deleted(instance)
+
+
+# cached catalog pages are keyed by the versions of the vendor and the
+# categories they list, a product change makes only those stale
+@receiver(post_save, sender=Product)
+def invalidate_saved_product(sender, instance, **kwargs):
+    bump_catalog_version(
+        *product_scopes(getattr(instance, "_facet_values", None), facets.product_values(instance))
+    )
+
+
+@receiver(post_delete, sender=Product)
+def invalidate_deleted_product(sender, instance, **kwargs):
+    bump_catalog_version(*product_scopes(facets.product_values(instance)))
@@ -1,3 +1,293 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from vendor.tests import create_vendor, PRODUCT_DATA
+from accounts.models import Vendor
+from vendor.models import Product
+from .cache import catalog_version, get_or_compute
+from .search import PAGE_SIZE
+from .facets import get_facets, rebuild_facets
+import threading
+import time
 
-# Create your tests here.
+
+class CatalogCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.vendor = create_vendor()
+        self.product = Product.objects.create(vendor=self.vendor, images=[], **PRODUCT_DATA)
+
+    def test_shop_page_is_served_from_cache(self):
+        self.client.get(reverse("shop_page"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("shop_page"))
+        self.assertContains(response, "Silk Saree")
+
+    def test_product_save_invalidates_page_and_card(self):
+        self.client.get(reverse("shop_page"))
+        version = catalog_version("category:women")
+
+        self.product.name = "Cotton Kurta"
+        self.product.save()
+
+        self.assertNotEqual(catalog_version("category:women"), version)
+        response = self.client.get(reverse("shop_page"))
+        self.assertContains(response, "Cotton Kurta")
+        self.assertNotContains(response, "Silk Saree")
+
+    def test_other_categories_stay_cached(self):
+        url = reverse("shop_page") + "?category=women"
+        self.client.get(url)
+
+        Product.objects.create(vendor=self.vendor, images=[], **{**PRODUCT_DATA, "category": "men"})
+
+        # only the facet counts, which cover every category, are read again
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        self.product.category = "men"
+        self.product.save()
+
+        response = self.client.get(url)
+        self.assertNotContains(response, "Silk Saree")
+
+    def test_any_category_invalidates_the_unfiltered_shop(self):
+        etag = self.client.get(reverse("shop_page"))["ETag"]
+
+        # categories are free text, not only the ones in CATEGORIES
+        Product.objects.create(vendor=self.vendor, images=[], **{**PRODUCT_DATA, "name": "Kids Kurta", "category": "kids"})
+
+        response = self.client.get(reverse("shop_page"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Kids Kurta")
+        self.assertIn("kids", dict(response.context["categories"]))
+
+    def test_product_delete_invalidates_page(self):
+        self.client.get(reverse("shop_page"))
+
+        self.product.delete()
+
+        self.assertNotContains(self.client.get(reverse("shop_page")), "Silk Saree")
+
+
+class ShopCatalogTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user, vendor = create_vendor()
+        for name, category, price, rating, stock in (
+            ("Silk Saree", "women", 1200, 4, 5),
+            ("Cotton Kurta", "men", 800, 5, 5),
+            ("Linen Shirt", "men", 2500, 3, 5),
+            ("Leather Bag", "accessories", 400, 2, 5),
+            ("Sold Out Saree", "women", 900, 5, 0),
+        ):
+            data = {**PRODUCT_DATA, "name": name, "category": category, "price": price, "rating": rating, "stock": stock}
+            Product.objects.create(vendor=vendor, images=[], **data)
+
+    def names(self, params):
+        response = self.client.get(reverse("shop_page"), params)
+        return [product["name"] for product in response.context["products"]]
+
+    def test_category_filter(self):
+        self.assertEqual(sorted(self.names({"category": "men"})), ["Cotton Kurta", "Linen Shirt"])
+        self.assertEqual(self.names({"category": "women"}), ["Silk Saree"])
+        self.assertEqual(self.names({"category": "men", "subcategory": "Bags"}), [])
+
+    def test_price_filter(self):
+        self.assertEqual(sorted(self.names({"min_price": 500, "max_price": 2000})), ["Cotton Kurta", "Silk Saree"])
+        self.assertEqual(self.names({"category": "men", "max_price": 1000}), ["Cotton Kurta"])
+
+    def test_price_ranges_match_their_counts(self):
+        Product.objects.create(vendor=Vendor.objects.get(), images=[], **{**PRODUCT_DATA, "name": "Edge Kurta", "price": 1000})
+
+        response = self.client.get(reverse("shop_page"))
+        for low, high, count in response.context["price_ranges"]:
+            params = {"min_price": low, **({"max_price": high} if high else {})}
+            self.assertEqual(len(self.names(params)), count or 0, (low, high))
+        self.assertEqual(self.names({"min_price": 1000, "max_price": 2000}), ["Edge Kurta", "Silk Saree"])
+
+    def test_sort_order(self):
+        self.assertEqual(
+            self.names({"sort": "price_low"}), ["Leather Bag", "Cotton Kurta", "Silk Saree", "Linen Shirt"]
+        )
+        self.assertEqual(
+            self.names({"sort": "price_high"}), ["Linen Shirt", "Silk Saree", "Cotton Kurta", "Leather Bag"]
+        )
+        self.assertEqual(self.names({"sort": "rating"}), ["Cotton Kurta", "Silk Saree", "Linen Shirt", "Leather Bag"])
+        self.assertEqual(self.names({}), ["Leather Bag", "Linen Shirt", "Cotton Kurta", "Silk Saree"])
+
+    def test_filtered_page_queries(self):
+        # the page and the facet counts, no COUNT over the catalog
+        with self.assertNumQueries(2):
+            self.names({"category": "men", "min_price": 500, "sort": "price_high"})
+        # the facet counts are cached for every filter
+        with self.assertNumQueries(1):
+            self.names({"category": "women", "sort": "rating"})
+
+
+class GetOrComputeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cold_key_is_computed_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_or_compute("cold", compute, 60)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["value"] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_value_is_refreshed_before_it_expires(self):
+        get_or_compute("warm", lambda: "old", 60)
+        value, delta, expires_at = cache.get("warm")
+        # pretend it took long to build and is about to expire
+        cache.set("warm", (value, 30, time.time() + 0.01), 60)
+
+        self.assertEqual(get_or_compute("warm", lambda: "new", 60), "new")
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        self.user, self.vendor = create_vendor()
+        self.product = Product.objects.create(vendor=self.vendor, images=[], **PRODUCT_DATA)
+
+    def revalidate(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_product_page(self):
+        url = reverse("product_page", args=[self.product.id])
+
+        self.assertEqual(self.revalidate(url).status_code, 304)
+
+        etag = self.client.get(url)["ETag"]
+        self.product.price = 999
+        self.product.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_shop_page_depends_on_query(self):
+        etag = self.client.get(reverse("shop_page"))["ETag"]
+
+        self.assertEqual(self.client.get(reverse("shop_page"), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response = self.client.get(reverse("shop_page"), {"category": "men"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_store_page(self):
+        self.client.force_login(self.user)
+        url = reverse("store")
+
+        self.assertEqual(self.revalidate(url).status_code, 304)
+
+        etag = self.client.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertFalse([query for query in queries if '"products"' in query["sql"]])
+
+        self.product.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_missing_product(self):
+        response = self.client.get(reverse("product_page", args=["00000000-0000-0000-0000-000000000000"]))
+        self.assertEqual(response.status_code, 404)
+
+
+class SearchPagingTest(TestCase):
+    def setUp(self):
+        self.user, self.vendor = create_vendor()
+        for number in range(PAGE_SIZE + 3):
+            Product.objects.create(vendor=self.vendor, images=[], **{**PRODUCT_DATA, "name": f"Silk Saree {number}"})
+
+    def pages(self, params):
+        names = []
+        while params is not None:
+            response = self.client.get(reverse("search_page"), params)
+            page = response.context["page"]
+            names += [product["name"] for product in page]
+            params = {**params, "after": page.next_cursor} if page.has_next else None
+        return page, names
+
+    def test_full_text_results_are_paged(self):
+        page, names = self.pages({"q": "saree"})
+
+        self.assertFalse(page.fuzzy)
+        self.assertEqual(len(names), PAGE_SIZE + 3)
+        self.assertEqual(len(set(names)), PAGE_SIZE + 3)
+
+    def test_typo_fallback_results_are_paged(self):
+        response = self.client.get(reverse("search_page"), {"q": "sareee"})
+        self.assertTrue(response.context["page"].fuzzy)
+        self.assertContains(response, "fuzzy=1")
+
+        page, names = self.pages({"q": "sareee", "fuzzy": "1"})
+
+        self.assertTrue(page.fuzzy)
+        self.assertEqual(len(set(names)), PAGE_SIZE + 3)
+
+
+class FacetDeltaTest(TestCase):
+    def setUp(self):
+        self.user, self.vendor = create_vendor()
+        self.product = Product.objects.create(vendor=self.vendor, images=[], **PRODUCT_DATA)
+
+    def assertFacetsRebuilt(self):
+        # the deltas leave the same counts as counting from scratch
+        counts = [get_facets(), get_facets(self.vendor.id)]
+        rebuild_facets()
+        self.assertEqual([get_facets(), get_facets(self.vendor.id)], counts)
+
+    def test_create(self):
+        facets = get_facets()
+        self.assertEqual(facets["category"], {"women": 1})
+        self.assertEqual(facets["subcategory"], {"women": {"Clothing": 1}})
+        self.assertEqual(facets["price"], {"1000": 1})
+        self.assertEqual(get_facets(self.vendor.id)["category"], {"women": 1})
+        self.assertFacetsRebuilt()
+
+    def test_edit(self):
+        self.product.price = 300
+        self.product.subcategory = "Bags"
+        self.product.save()
+
+        facets = get_facets()
+        self.assertEqual(facets["price"], {"0": 1})
+        self.assertEqual(facets["subcategory"], {"women": {"Bags": 1}})
+        self.assertFacetsRebuilt()
+
+    def test_category_change(self):
+        Product.objects.create(vendor=self.vendor, images=[], **PRODUCT_DATA)
+
+        self.product.category = "men"
+        self.product.save()
+
+        self.assertEqual(get_facets()["category"], {"women": 1, "men": 1})
+        self.assertEqual(get_facets(self.vendor.id)["subcategory"], {"women": {"Clothing": 1}, "men": {"Clothing": 1}})
+        self.assertFacetsRebuilt()
+
+    def test_out_of_stock_and_delete(self):
+        self.product.stock = 0
+        self.product.save()
+        self.assertEqual(get_facets()["category"], {})
+
+        self.product.stock = 3
+        self.product.save()
+        self.product.delete()
+
+        self.assertEqual(get_facets(), {"category": {}, "subcategory": {}, "price": {}})
+        self.assertFacetsRebuilt()
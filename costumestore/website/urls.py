@@ -5,5 +5,8 @@ urlpatterns = [
     path("", views.home_page, name="home_page"),
     path("cart", views.cart_page, name="cart_page"),
     path("shop", views.shop_page, name="shop_page"),
+    path("product/<uuid:id>", views.product_page, name="product_page"),
+    path("search", views.search_page, name="search_page"),
+    path("search/suggest", views.search_suggestions, name="search_suggestions"),
     path("contact", views.contact_page, name="contact_page"),
 ]
@@ -1,5 +1,15 @@
-from django.shortcuts import render
+from django.shortcuts import render, get_object_or_404
 from django.contrib.auth import logout
+from django.contrib import messages
+from django.http import JsonResponse
+from vendor.conditional import conditional
+from vendor.models import Product
+from orders.cart import Cart
+from .catalog import get_cached_catalog_page, filter_scopes, sale_price, CATEGORIES, PRICE_RANGES, CATALOG_TIMEOUT
+from .cache import catalog_key, catalog_version, get_or_compute
+from .search import search_products, get_suggestions
+from .facets import get_facets
+from .forms import CatalogFilters
 
 
 def home_page(req):
@@ -7,11 +17,104 @@ def home_page(req):
 
 
 def cart_page(req):
-    return render(req, "website/cart.html")
+    lines = Cart(req.session).lines()
+    return render(
+        req,
+        "website/cart.html",
+        context={"lines": lines, "subtotal": sum(line["total"] for line in lines)},
+    )
 
 
+def catalog_state(req):
+    # the catalog versions of the listed vendor or categories change with
+    # every save or delete of their products (and bulk load), a
+    # max(updated_at) over the listing would miss deletes
+    form = CatalogFilters(req.GET)
+    return None, catalog_version(*filter_scopes(form.cleaned_data if form.is_valid() else {}))
+
+
+@conditional(catalog_state)
 def shop_page(req):
-    return render(req, "website/shop.html")
+    form = CatalogFilters(req.GET)
+    filters = form.cleaned_data if form.is_valid() else {}
+
+    page = get_cached_catalog_page(filters)
+    facets = get_or_compute(
+        catalog_key("facets", filter_scopes({"vendor": filters.get("vendor")}), filters.get("vendor")),
+        lambda: get_facets(filters.get("vendor")),
+        CATALOG_TIMEOUT,
+    )
+
+    # facet counts are precomputed, categories fall back to the defaults
+    # until the counts have been built
+    categories = [(c, facets["category"].get(c)) for c in facets["category"] or CATEGORIES]
+    subcategories = sorted(facets["subcategory"].get(filters.get("category"), {}).items())
+    price_ranges = [(low, high, facets["price"].get(str(low))) for low, high in PRICE_RANGES]
+
+    # query string without the page cursor, reused by the pagination links
+    query = req.GET.copy()
+    query.pop("after", None)
+    query.pop("before", None)
+
+    return render(
+        req,
+        "website/shop.html",
+        context={
+            "products": page["object_list"],
+            "page": page,
+            "filters": filters,
+            "query": query.urlencode(),
+            "categories": categories,
+            "subcategories": subcategories,
+            "sorts": CatalogFilters.SORT_CHOICES,
+            "price_ranges": price_ranges,
+        },
+    )
+
+
+def search_page(req):
+    query = req.GET.get("q", "").strip()[:100]
+    page = None
+
+    if query:
+        page = search_products(
+            query,
+            after=req.GET.get("after"),
+            before=req.GET.get("before"),
+            fuzzy=req.GET.get("fuzzy") == "1",
+        )
+
+    return render(
+        req,
+        "website/search.html",
+        context={
+            "q": query,
+            "page": page,
+            "products": page.object_list if page else [],
+        },
+    )
+
+
+def search_suggestions(req):
+    return JsonResponse({"suggestions": get_suggestions(req.GET.get("q", ""))})
+
+
+def product_state(req, id):
+    # a pending message (not enough stock at checkout) has to be rendered,
+    # not answered with a 304
+    if len(messages.get_messages(req)):
+        return None, None
+    # the page also shows the vendor's shop name
+    updated = Product.objects.filter(pk=id).values_list("updated_at", "vendor__updated_at").first()
+    return (max(updated), None) if updated else (None, None)
+
+
+@conditional(product_state)
+def product_page(req, id):
+    product = get_object_or_404(
+        Product.objects.select_related("vendor").annotate(sale_price=sale_price()), pk=id
+    )
+    return render(req, "website/product.html", context={"product": product})
 
 
 def contact_page(req):